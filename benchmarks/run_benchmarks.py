@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks du rapport et des scripts de données sur des volumes croissants.
+
+Pour chaque taille, un espace de travail benchmarks/data/<taille>/ reproduit
+l'arborescence WEBAPP_PUBLICATION (stockage synthétique, broyage_data.json
+et, jusqu'à --json-max enregistrements, le JSON de la webapp) ; les
+mesures y sont faites avec les chemins par défaut du générateur :
+
+- conversion_json : json.load et conversion vers le stockage colonnaire ;
+- lecture_stockage : lecture complète des colonnes ;
+- initialisation : construction de DetailedCocoaReportGenerator ;
+- cube, requete : agrégation de la section 3, requête filtrée par exportateur ;
+- donnees_graphiques, graphiques : séries des graphiques et tracé (1 processus) ;
+- docx : construction des sections, assemblage et enregistrement du rapport.
+
+Le démarrage à froid (nouvel interpréteur qui importe le générateur ou
+l'outil de requêtes) est mesuré indépendamment de la taille et comparé à
+l'objectif COLD_START_TARGET_S ; la sous-commande cold-start échoue si
+l'objectif est dépassé.
+
+Chaque mesure est répétée --repeat fois (médiane, minimum et toutes les
+valeurs, en secondes). Les résultats sont enregistrés en JSON avec le
+commit courant, pour comparer deux commits :
+
+    python3 benchmarks/run_benchmarks.py run --sizes 10k,100k,1M,10M
+    python3 benchmarks/run_benchmarks.py compare benchmarks/results/A.json benchmarks/results/B.json
+    python3 benchmarks/run_benchmarks.py cold-start
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from export_store import ExportStore, JSON_PATH, STORE_PATH, convert_json, export_json  # noqa: E402
+from generate_detailed_cocoa_report import BROYAGE_PATH, DetailedCocoaReportGenerator  # noqa: E402
+from query_export import query  # noqa: E402
+from report_charts import render_charts  # noqa: E402
+from synthetic_exports import generate_store, parse_size, size_label  # noqa: E402
+
+DATA_DIR = os.path.join(BENCH_DIR, 'data')
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+DEFAULT_SIZES = '10k,100k,1M,10M'
+JSON_MAX = '100k'
+REGRESSION_THRESHOLD = 0.10
+
+# Démarrage à froid : import des modules en ligne de commande dans un nouvel interpréteur
+COLD_START_TARGET_S = 0.5
+COLD_START_MODULES = {
+    'import_generateur': 'generate_detailed_cocoa_report',
+    'import_lots': 'generate_batch_reports',
+    'import_requetes': 'query_export',
+}
+
+
+def git_commit():
+    """Commit courant et état de l'arbre de travail"""
+    def git(*args):
+        return subprocess.run(['git', *args], cwd=REPO_DIR, capture_output=True, text=True).stdout.strip()
+    return {'commit': git('rev-parse', 'HEAD') or None, 'dirty': bool(git('status', '--porcelain'))}
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+@contextmanager
+def workspace(path):
+    """Se place dans l'espace de travail d'une taille le temps des mesures"""
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def prepare_workspace(records, data_dir, json_max):
+    """Crée (ou réutilise) l'espace de travail d'une taille et retourne son chemin"""
+    path = os.path.join(data_dir, size_label(records))
+    store_path = os.path.join(path, STORE_PATH)
+    manifest_path = os.path.join(store_path, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        print(f'Génération de {records:,} enregistrements synthétiques...')
+        generate_store(store_path, records)
+    shutil.copy(os.path.join(REPO_DIR, BROYAGE_PATH), os.path.join(path, BROYAGE_PATH))
+    json_path = os.path.join(path, JSON_PATH)
+    if records <= json_max and not os.path.exists(json_path):
+        export_json(ExportStore(store_path), json_path)
+    return path
+
+
+def measure(func, repeat):
+    """Exécute func repeat fois ; retourne les statistiques de durée et le dernier résultat"""
+    runs = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        runs.append(time.perf_counter() - start)
+    return {'median_s': statistics.median(runs), 'min_s': min(runs), 'runs_s': runs}, result
+
+
+def cold_start(repeat):
+    """Durées d'import des modules en ligne de commande, comparées à l'objectif"""
+    results = {}
+    for name, module in COLD_START_MODULES.items():
+        command = [sys.executable, '-c', f'import {module}']
+        subprocess.run(command, cwd=REPO_DIR, check=True)  # fichiers .pyc à jour
+        results[name], _ = measure(lambda: subprocess.run(command, cwd=REPO_DIR, check=True), repeat)
+        results[name]['target_s'] = COLD_START_TARGET_S
+        status = '✅' if results[name]['median_s'] <= COLD_START_TARGET_S else '⚠️ '
+        print(f"  {name:<22}{results[name]['median_s']:>10.3f} s  {status} objectif {COLD_START_TARGET_S} s")
+    return results
+
+
+def run_size(records, data_dir, json_max, repeat):
+    """Toutes les mesures d'une taille de jeu de données"""
+    path = prepare_workspace(records, data_dir, json_max)
+    results = {}
+
+    def bench(name, func, times=repeat):
+        results[name], value = measure(func, times)
+        print(f"  {name:<22}{results[name]['median_s']:>10.3f} s")
+        return value
+
+    with workspace(path):
+        if os.path.exists(JSON_PATH):
+            converted = os.path.join('.bench', 'export_store')
+            bench('conversion_json', lambda: convert_json(JSON_PATH, converted))
+            shutil.rmtree('.bench')
+
+        store = ExportStore(STORE_PATH)
+        bench('lecture_stockage', lambda: [store.column(name) for name in store.fields])
+
+        generator = bench('initialisation', lambda: DetailedCocoaReportGenerator(
+            use_cache=False, chart_workers=1, section_workers=1))
+        generator.aggregates = {'cube': bench('cube', generator.build_export_cube)}
+        bench('requete', lambda: query(generator.export_store, 'exportateur_simple',
+                                       {'produit_simple': 'FEVES'}, top=20))
+
+        chart_data = bench('donnees_graphiques', generator.build_chart_data)
+        generator.chart_images = bench('graphiques', lambda: render_charts(chart_data, max_workers=1))
+
+        os.makedirs('.bench', exist_ok=True)
+        bench('docx', lambda: generator.generate_report(filename=os.path.join('.bench', 'rapport.docx')))
+        shutil.rmtree('.bench')
+
+    results['peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return results
+
+
+def run(args):
+    sizes = [parse_size(size) for size in args.sizes.split(',')]
+    report = dict(git_commit(), created=datetime.now().isoformat(timespec='seconds'),
+                  environment=environment(), repeat=args.repeat, sizes={})
+    print('🚀 Démarrage à froid')
+    report['cold_start'] = cold_start(args.repeat)
+    for records in sizes:
+        print(f'📊 {records:,} enregistrements')
+        report['sizes'][size_label(records)] = dict(records=records, **run_size(
+            records, args.data_dir, parse_size(args.json_max), args.repeat))
+
+    output = args.output
+    if output is None:
+        commit = (report['commit'] or 'inconnu')[:10] + ('-modifie' if report['dirty'] else '')
+        output = os.path.join(RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}_{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f'✅ Résultats enregistrés : {output}')
+    return 0
+
+
+def compare(args):
+    """Compare les médianes de deux fichiers de résultats ; code 1 en cas de régression"""
+    with open(args.base, 'r', encoding='utf-8') as f:
+        base = json.load(f)
+    with open(args.new, 'r', encoding='utf-8') as f:
+        new = json.load(f)
+
+    print(f"Référence : {(base.get('commit') or '?')[:10]}   Nouveau : {(new.get('commit') or '?')[:10]}")
+    groups = [('🚀 Démarrage à froid', base.get('cold_start', {}), new.get('cold_start', {}))]
+    groups += [(f'📊 {size}', base['sizes'][size], results)
+               for size, results in new['sizes'].items() if size in base['sizes']]
+    regressions = 0
+    for title, base_results, results in groups:
+        print(f'\n{title}')
+        for name, stats in results.items():
+            reference = base_results.get(name)
+            if not isinstance(stats, dict) or not isinstance(reference, dict):
+                continue
+            ratio = stats['median_s'] / reference['median_s'] if reference['median_s'] else float('inf')
+            flag = ''
+            if ratio > 1 + args.threshold:
+                flag = '  ⚠️  régression'
+                regressions += 1
+            elif ratio < 1 - args.threshold:
+                flag = '  ✅ amélioration'
+            print(f"  {name:<22}{reference['median_s']:>10.3f} s{stats['median_s']:>10.3f} s"
+                  f"{ratio:>8.2f}x{flag}")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks sur des jeux d'exportations synthétiques")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="Exécute les benchmarks")
+    run_parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                            help=f"Tailles séparées par des virgules (défaut : {DEFAULT_SIZES})")
+    run_parser.add_argument('--repeat', type=int, default=3, help="Répétitions de chaque mesure")
+    run_parser.add_argument('--json-max', default=JSON_MAX,
+                            help=f"Taille maximale pour les mesures sur le JSON (défaut : {JSON_MAX})")
+    run_parser.add_argument('--data-dir', default=DATA_DIR, help="Répertoire des jeux synthétiques")
+    run_parser.add_argument('--output', default=None,
+                            help="Fichier de résultats (défaut : benchmarks/results/<date>_<commit>.json)")
+
+    compare_parser = subparsers.add_parser('compare', help="Compare deux fichiers de résultats")
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                                help="Écart relatif signalé (défaut : 0.10)")
+
+    cold_parser = subparsers.add_parser('cold-start', help="Vérifie l'objectif de démarrage à froid")
+    cold_parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == 'cold-start':
+        results = cold_start(args.repeat)
+        sys.exit(0 if all(stats['median_s'] <= COLD_START_TARGET_S for stats in results.values()) else 1)
+    sys.exit(run(args) if args.command == 'run' else compare(args))
+
+
+if __name__ == '__main__':
+    main()
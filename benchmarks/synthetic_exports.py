@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Jeux de données d'exportation synthétiques pour les benchmarks.
+
+Le schéma est celui de dynamic_data_enriched.json (poids_net, valfob,
+destination, *_simple, port, mois...) et les distributions reproduisent
+l'asymétrie des données réelles :
+
+- destinations : quelques pays concentrent l'essentiel (Pays-Bas ~30 %),
+  suivis d'une longue traîne de codes pays ;
+- exportateurs, déclarants et destinataires : loi de Zipf (quelques gros
+  opérateurs, beaucoup de petits) ; le nombre de destinataires croît avec
+  le volume pour que les annexes détaillées grandissent aussi ;
+- poids log-normal, valeur FOB proportionnelle au poids selon le produit.
+
+Les colonnes sont écrites directement au format du stockage colonnaire
+(segments d'au plus segment_rows lignes), sans passer par le JSON : 10
+millions d'enregistrements se génèrent en quelques secondes.
+
+    python3 benchmarks/synthetic_exports.py 1M benchmarks/data/1M
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from export_store import FILTER_FIELDS, KIND_CATEGORY, KIND_FLOAT, KIND_INT, MANIFEST  # noqa: E402
+
+SEGMENT_ROWS = 1_000_000
+
+# Parts des destinations (en nombre de transactions) ; le reste est réparti sur la traîne
+DESTINATIONS = {'NL': 0.30, 'FR': 0.11, 'US': 0.09, 'BE': 0.07, 'DE': 0.06, 'MY': 0.05, 'GB': 0.04,
+                'ES': 0.03, 'CA': 0.02, 'EE': 0.02, 'IT': 0.02, 'ZA': 0.015, 'TR': 0.015, 'PL': 0.01,
+                'BR': 0.01, 'ID': 0.01, 'CN': 0.01, 'JP': 0.01}
+TAIL_DESTINATIONS = ['PT', 'AU', 'MX', 'IL', 'BG', 'MA', 'EG', 'QA', 'LT', 'CM', 'UY', 'SN', 'RU', 'HR',
+                     'AR', 'CL', 'IN', 'KR', 'SG', 'TH', 'VN', 'NG', 'GH', 'DZ', 'TN', 'SA', 'AE']
+
+# Produit → (part des transactions, prix FOB moyen en FCFA par kg)
+PRODUCTS = {'FEVES': (0.60, 1800), 'BEURRE': (0.12, 5200), 'MASSE': (0.10, 3400),
+            'POUDRE': (0.08, 2600), 'TOURTEAUX': (0.05, 600), 'COQUES': (0.05, 150)}
+PACKAGINGS = {'SACS JUTE': 0.45, 'VRAC': 0.25, 'CONTENEUR': 0.15, 'BIG BAGS': 0.10, 'CARTONS': 0.05}
+PORTS = {'ABIDJAN': 0.6, 'SAN PEDRO': 0.4}
+MONTHS = ['2024-10', '2024-11', '2024-12', '2025-01', '2025-02', '2025-03', '2025-04', '2025-05',
+          '2025-06', '2025-07']
+
+EXPORTERS = 120
+DECLARANTS = 300
+MISSING_RATE = 0.02
+
+COLUMNS = [['id', KIND_INT], ['poids_net', KIND_FLOAT], ['valfob', KIND_INT],
+           ['destination', KIND_CATEGORY], ['exportateur', KIND_CATEGORY],
+           ['exportateur_simple', KIND_CATEGORY], ['declarant_simple', KIND_CATEGORY],
+           ['destinataire_simple', KIND_CATEGORY], ['produit_simple', KIND_CATEGORY],
+           ['emballage_simple', KIND_CATEGORY], ['port', KIND_CATEGORY], ['mois', KIND_CATEGORY]]
+
+
+def parse_size(text):
+    """Nombre d'enregistrements, avec suffixe k ou M (ex. 10k, 1M)"""
+    text = text.strip()
+    factor = {'k': 1_000, 'K': 1_000, 'm': 1_000_000, 'M': 1_000_000}.get(text[-1:], 1)
+    return int(float(text[:-1] if factor > 1 else text) * factor)
+
+
+def size_label(records):
+    """Libellé court d'un nombre d'enregistrements (10k, 1M...)"""
+    if records % 1_000_000 == 0:
+        return f'{records // 1_000_000}M'
+    if records % 1_000 == 0:
+        return f'{records // 1_000}k'
+    return str(records)
+
+
+def _zipf(count, exponent=1.1):
+    weights = 1.0 / np.arange(1, count + 1) ** exponent
+    return weights / weights.sum()
+
+
+def _shares(shares):
+    values = np.asarray(list(shares.values()), dtype=np.float64)
+    return values / values.sum()
+
+
+def dictionaries(records):
+    """Tables de libellés des champs texte pour un jeu de records enregistrements"""
+    consignees = int(min(max(50, records // 200), 50_000))
+    exporters = [f'EXPORTATEUR {i:03d}' for i in range(EXPORTERS)]
+    return {
+        'destination': list(DESTINATIONS) + TAIL_DESTINATIONS,
+        'exportateur': [f'{name} SA' for name in exporters],
+        'exportateur_simple': exporters,
+        'declarant_simple': [f'DECLARANT {i:03d}' for i in range(DECLARANTS)],
+        'destinataire_simple': [f'DESTINATAIRE {i:05d}' for i in range(consignees)],
+        'produit_simple': list(PRODUCTS),
+        'emballage_simple': list(PACKAGINGS),
+        'port': list(PORTS),
+        'mois': MONTHS,
+    }
+
+
+def generate_segment(rng, start, rows, labels):
+    """Colonnes NumPy d'un segment de rows enregistrements"""
+    tail = 1.0 - sum(DESTINATIONS.values())
+    destination_p = np.concatenate([list(DESTINATIONS.values()),
+                                    np.full(len(TAIL_DESTINATIONS), tail / len(TAIL_DESTINATIONS))])
+    columns = {
+        'id': np.arange(start + 1, start + rows + 1, dtype=np.int64),
+        'destination': rng.choice(len(destination_p), rows, p=destination_p / destination_p.sum()),
+        'exportateur_simple': rng.choice(EXPORTERS, rows, p=_zipf(EXPORTERS)),
+        'declarant_simple': rng.choice(DECLARANTS, rows, p=_zipf(DECLARANTS)),
+        'destinataire_simple': rng.choice(len(labels['destinataire_simple']), rows,
+                                          p=_zipf(len(labels['destinataire_simple']))),
+        'produit_simple': rng.choice(len(PRODUCTS), rows, p=_shares({k: v[0] for k, v in PRODUCTS.items()})),
+        'emballage_simple': rng.choice(len(PACKAGINGS), rows, p=_shares(PACKAGINGS)),
+        'port': rng.choice(len(PORTS), rows, p=_shares(PORTS)),
+        'mois': rng.integers(0, len(MONTHS), rows),
+    }
+    columns['exportateur'] = columns['exportateur_simple']
+    columns['destinataire_simple'] = np.where(rng.random(rows) < MISSING_RATE, -1,
+                                              columns['destinataire_simple'])
+
+    weights = np.round(rng.lognormal(np.log(100_000), 1.0, rows), 3)
+    prices = np.array([price for _, price in PRODUCTS.values()], dtype=np.float64)
+    columns['poids_net'] = weights
+    columns['valfob'] = np.rint(weights * prices[columns['produit_simple']]
+                                * rng.lognormal(0.0, 0.1, rows)).astype(np.int64)
+
+    for name, kind in COLUMNS:
+        if kind == KIND_CATEGORY:
+            columns[name] = columns[name].astype(np.int32)
+    return columns
+
+
+def generate_store(path, records, seed=0, segment_rows=SEGMENT_ROWS):
+    """Écrit un stockage colonnaire synthétique de records enregistrements"""
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.makedirs(path)
+    rng = np.random.default_rng(seed)
+    labels = dictionaries(records)
+    manifest = {'metadata': {}, 'filters': {}, 'columns': COLUMNS, 'dictionaries': labels, 'segments': []}
+
+    total_weight = 0.0
+    total_value = 0
+    for index, start in enumerate(range(0, records, segment_rows)):
+        rows = min(segment_rows, records - start)
+        columns = generate_segment(rng, start, rows, labels)
+        name = f'segment_{index:04d}'
+        os.makedirs(os.path.join(path, name))
+        for column, values in columns.items():
+            np.save(os.path.join(path, name, f'{column}.npy'), values)
+        manifest['segments'].append({'name': name, 'rows': rows, 'label': 'synthetique'})
+        total_weight += float(columns['poids_net'].sum())
+        total_value += int(columns['valfob'].sum())
+
+    manifest['metadata'] = {'total_weight': total_weight, 'total_value': total_value,
+                            'total_records': records}
+    manifest['filters'] = {key: sorted(labels[field]) for key, field in FILTER_FIELDS.items()}
+    with open(os.path.join(path, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère un stockage d'exportations synthétique")
+    parser.add_argument('records', help="Nombre d'enregistrements (ex. 10k, 1M)")
+    parser.add_argument('path', help="Répertoire du stockage à créer (remplacé s'il existe)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--segment-rows', type=int, default=SEGMENT_ROWS)
+    args = parser.parse_args()
+
+    records = parse_size(args.records)
+    generate_store(args.path, records, args.seed, args.segment_rows)
+    print(f'✅ {records:,} enregistrements synthétiques écrits dans {args.path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache disque borné en taille avec éviction LRU.
+
+Chaque entrée est un fichier pickle nommé d'après sa clé. La date de
+modification sert d'horodatage d'accès : elle est mise à jour à chaque
+lecture, et les entrées les plus anciennes sont supprimées dès que la
+taille totale dépasse la limite.
+"""
+
+import hashlib
+import os
+import pickle
+
+CACHE_ROOT = '.cache'
+
+
+def fingerprint(paths, salt=''):
+    """Empreinte SHA-256 du contenu des fichiers (répertoires parcourus récursivement)"""
+    digest = hashlib.sha256(salt.encode('utf-8'))
+    for path in paths:
+        if os.path.isdir(path):
+            files = sorted(
+                os.path.join(root, name)
+                for root, _, names in os.walk(path)
+                for name in names
+                if not name.endswith('.tmp')
+            )
+        else:
+            files = [path]
+        for file_path in files:
+            digest.update(os.path.relpath(file_path, path).encode('utf-8'))
+            with open(file_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """Cache clé → objet Python stocké sur disque"""
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.pkl')
+
+    def get(self, key):
+        """Retourne l'objet associé à la clé, ou None s'il est absent"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        os.utime(path)
+        return value
+
+    def put(self, key, value):
+        """Enregistre un objet puis applique la limite de taille"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def entries(self):
+        """Entrées du cache (chemin, taille, date d'accès)"""
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.pkl'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def evict(self):
+        """Supprime les entrées les moins récemment utilisées au-delà de la limite"""
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def purge(self):
+        """Vide le cache"""
+        for path, _, _ in self.entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
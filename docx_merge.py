@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Assemblage de documents Word.
+
+Un fragment (document complet produit séparément, par exemple une section
+du rapport) est ajouté à la fin du document principal :
+
+- les éléments du corps sont copiés avant les propriétés de section
+  finales du document principal, dont la mise en page est conservée ;
+- les images sont ajoutées au paquet principal (dédoublonnées par
+  empreinte) et chaque référence r:embed est reliée à la nouvelle
+  relation créée par part.relate_to ;
+- les identifiants wp:docPr des images sont renumérotés pour rester
+  uniques dans le document ;
+- les styles du fragment absents du document principal sont recopiés.
+
+Les fragments doivent être créés à partir du même modèle que le document
+principal, dont ils partagent les définitions de numérotation (listes).
+"""
+
+import copy
+import io
+
+from docx import Document
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml.ns import qn
+
+
+def copy_missing_styles(target, source):
+    """Recopie les styles de source absents de target"""
+    styles = target.styles.element
+    existing = {style.get(qn('w:styleId')) for style in styles.findall(qn('w:style'))}
+    for style in source.styles.element.findall(qn('w:style')):
+        if style.get(qn('w:styleId')) not in existing:
+            styles.append(copy.deepcopy(style))
+
+
+def _relink_images(target, source, element):
+    """Relie les images d'un élément copié aux parties du document principal"""
+    for blip in element.iter(qn('a:blip')):
+        rid = blip.get(qn('r:embed'))
+        if rid is None:
+            continue
+        image_part = source.part.related_parts[rid]
+        target_part = target.part.package.get_or_add_image_part(io.BytesIO(image_part.blob))
+        blip.set(qn('r:embed'), target.part.relate_to(target_part, RT.IMAGE))
+
+
+def append_document(target, source):
+    """Ajoute le contenu de source (Document ou octets .docx) à la fin de target"""
+    if isinstance(source, (bytes, bytearray)):
+        source = Document(io.BytesIO(source))
+
+    copy_missing_styles(target, source)
+    body = target.element.body
+    sect_pr = body.find(qn('w:sectPr'))
+    for child in source.element.body.iterchildren():
+        if child.tag == qn('w:sectPr'):
+            continue
+        element = copy.deepcopy(child)
+        _relink_images(target, source, element)
+        if sect_pr is not None:
+            sect_pr.addprevious(element)
+        else:
+            body.append(element)
+        for doc_pr in element.iter(qn('wp:docPr')):
+            doc_pr.set('id', str(target.part.next_id))
+    return target
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Écriture de tableaux Word en bloc.
+
+python-docx crée le tableau vide (propriétés, style, grille des colonnes),
+puis les lignes sont écrites directement en texte XML et analysées en une
+seule fois par lxml, sans passer par les objets Cell, Paragraph et Run
+cellule par cellule. Le contenu produit est celui qu'écrirait cell.text,
+avec les lignes en gras (l'en-tête) marquées au niveau du run.
+
+Les tableaux issus d'un DataFrame sont décrits par une liste de colonnes
+(en-tête, source, format) : la source est un nom de colonne, RANK (rang
+1..n), INDEX (libellés de l'index) ou une fonction du DataFrame ; chaque
+colonne est formatée en bloc, avec son propre type (les nombres de
+transactions restent des entiers).
+
+Les grands tableaux (annexes de plusieurs dizaines de milliers de lignes)
+sont écrits par tranches de chunk_rows lignes : seule la tranche en cours
+existe sous forme de textes Python avant d'être convertie en XML.
+"""
+
+import re
+from xml.sax.saxutils import escape
+
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+
+RANK = 'rang'
+INDEX = 'index'
+CHUNK_ROWS = 2000
+
+_SPECIAL_CHARS = re.compile('([\t\n])')
+
+
+def _run(text, run_pr):
+    if text == text.strip() and not _SPECIAL_CHARS.search(text):
+        return f'<w:r>{run_pr}<w:t>{escape(text)}</w:t></w:r>'
+    parts = []
+    for part in _SPECIAL_CHARS.split(text):
+        if part == '\n':
+            parts.append('<w:br/>')
+        elif part == '\t':
+            parts.append('<w:tab/>')
+        elif part != part.strip():
+            parts.append(f'<w:t xml:space="preserve">{escape(part)}</w:t>')
+        elif part:
+            parts.append(f'<w:t>{escape(part)}</w:t>')
+    return f'<w:r>{run_pr}{"".join(parts)}</w:r>'
+
+
+def _rows_xml(rows, widths, bold=False, size=None):
+    """Texte XML des lignes w:tr d'un tableau"""
+    properties = ('<w:b/>' if bold else '') + (f'<w:sz w:val="{int(size.pt * 2)}"/>' if size is not None else '')
+    run_pr = f'<w:rPr>{properties}</w:rPr>' if properties else ''
+    cells = [f'<w:tc><w:tcPr><w:tcW w:w="{width}" w:type="dxa"/></w:tcPr><w:p>' for width in widths]
+    return ''.join(
+        '<w:tr>' + ''.join(cell + (_run(text, run_pr) if text else '') + '</w:p></w:tc>'
+                           for cell, text in zip(cells, row)) + '</w:tr>'
+        for row in rows)
+
+
+def _extend(table, rows_xml):
+    """Analyse les lignes en une fois et les ajoute à la fin du tableau"""
+    table._tbl.extend(parse_xml(f'<w:tbl {nsdecls("w")}>{rows_xml}</w:tbl>'))
+
+
+def _widths(table):
+    return [col.get(qn('w:w')) for col in table._tbl.tblGrid.iterchildren(qn('w:gridCol'))]
+
+
+def append_rows(table, rows, bold=False):
+    """Ajoute des lignes de texte (non formatées) à la fin d'un tableau"""
+    widths = _widths(table)
+    rows = ([str(value) for value in row] + [''] * (len(widths) - len(row)) for row in rows)
+    _extend(table, _rows_xml(rows, widths, bold))
+
+
+def add_table(doc, rows, style=None, bold_rows=(0,), header_size=None):
+    """Ajoute un tableau de textes au document et le retourne.
+
+    rows est une liste de lignes (la première est l'en-tête), les lignes
+    courtes étant complétées par des cellules vides. Les lignes d'indices
+    bold_rows sont en gras ; header_size fixe la taille de l'en-tête.
+    """
+    rows = [[str(value) for value in row] for row in rows]
+    cols = max(len(row) for row in rows)
+    table = doc.add_table(rows=0, cols=cols)
+    if style is not None:
+        table.style = style
+    widths = _widths(table)
+    bold_rows = set(bold_rows)
+    _extend(table, ''.join(
+        _rows_xml([row + [''] * (cols - len(row))], widths, i in bold_rows, header_size if i == 0 else None)
+        for i, row in enumerate(rows)))
+    return table
+
+
+def frame_rows(frame, columns, first_rank=1):
+    """Lignes de texte (sans en-tête) d'un DataFrame décrit par (en-tête, source, format)"""
+    texts = []
+    for _, source, fmt in columns:
+        if source == RANK:
+            values = range(first_rank, first_rank + len(frame))
+        elif source == INDEX:
+            values = frame.index.tolist()
+        elif callable(source):
+            values = source(frame).tolist()
+        else:
+            values = frame[source].tolist()
+        texts.append([fmt.format(value) for value in values])
+    return [list(row) for row in zip(*texts)]
+
+
+def frame_chunks(frame, columns, chunk_rows=CHUNK_ROWS):
+    """Lignes de texte d'un DataFrame, produites par tranches de chunk_rows"""
+    for start in range(0, len(frame), chunk_rows):
+        yield frame_rows(frame.iloc[start:start + chunk_rows], columns, first_rank=start + 1)
+
+
+def add_frame_table(doc, frame, columns, style=None, chunk_rows=CHUNK_ROWS):
+    """Ajoute le tableau d'un DataFrame (en-tête en gras), écrit par tranches"""
+    table = add_table(doc, [[header for header, _, _ in columns]], style=style)
+    for rows in frame_chunks(frame, columns, chunk_rows):
+        append_rows(table, rows)
+    return table
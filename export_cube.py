@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Moteur d'agrégation des exportations.
+
+Chaque dimension d'analyse est agrégée par np.bincount sur ses codes de
+catégorie (un appel pour le comptage, un par mesure), segment par segment :
+les colonnes restent mappées en mémoire et aucun tableau intermédiaire ne
+grandit avec le nombre de dimensions. Le cube obtenu ne contient que des tableaux NumPy et des libellés ; il
+alimente les tableaux et graphiques du rapport.
+"""
+
+import numpy as np
+
+from export_store import map_codes
+
+MEASURES = ('poids_net', 'valfob')
+
+
+class ExportCube:
+    """Agrégats (somme des mesures, nombre de transactions) par dimension"""
+
+    def __init__(self, labels, counts, sums, totals):
+        self.labels = labels
+        self.counts = counts
+        self.sums = sums
+        self.totals = totals
+
+    @property
+    def dimensions(self):
+        return list(self.labels)
+
+    def total(self, measure='poids_net'):
+        """Total d'une mesure sur l'ensemble des enregistrements"""
+        return self.totals[measure]
+
+    def nunique(self, dimension):
+        """Nombre de modalités effectivement présentes"""
+        return int(np.count_nonzero(self.counts[dimension]))
+
+    def share(self, dimension, label, measure='poids_net'):
+        """Part (en %) d'une modalité dans le total de la mesure, 0 si elle est absente"""
+        labels = self.labels[dimension]
+        total = self.totals[measure]
+        if label not in labels or not total:
+            return 0.0
+        return float(self.sums[dimension][measure][labels.index(label)] / total * 100)
+
+    def rollup(self, dimension, top=None):
+        """Agrégats d'une dimension, triés par poids décroissant.
+
+        Le DataFrame retourné a la même forme que
+        df.groupby(dimension).agg({'poids_net': 'sum', 'id': 'count'}) :
+        une ligne par modalité présente, colonne id pour le nombre de
+        transactions.
+        """
+        import pandas as pd
+
+        present = self.counts[dimension] > 0
+        data = {measure: values[present] for measure, values in self.sums[dimension].items()}
+        data['id'] = self.counts[dimension][present]
+        index = pd.Index(np.asarray(self.labels[dimension], dtype=object)[present], name=dimension)
+        stats = pd.DataFrame(data, index=index).sort_values('poids_net', ascending=False)
+        if top is not None:
+            stats = stats.head(top)
+        return stats
+
+
+def build_cube(store, dimensions, derived=None, measures=MEASURES, mask=None):
+    """Calcule le cube des dimensions demandées à partir du stockage.
+
+    derived associe le nom d'une dimension calculée à un triplet
+    (champ source, correspondance, valeur par défaut), par exemple les
+    codes pays ramenés à un nom de pays. mask (tableau booléen sur les
+    enregistrements) restreint l'agrégation aux enregistrements retenus.
+    """
+    derived = derived or {}
+    measures = [m for m in measures if m in store.kinds]
+
+    sources = {derived[d][0] if d in derived else d for d in dimensions}
+
+    labels = {}
+    counts = {}
+    sums = {}
+    totals = dict.fromkeys(measures, 0.0)
+    for columns in store.iter_segment_columns(sorted(sources) + measures, mask):
+        weights = {measure: np.nan_to_num(columns[measure].astype(np.float64)) for measure in measures}
+        for measure in measures:
+            totals[measure] += float(np.nansum(columns[measure]))
+        for dimension in dimensions:
+            if dimension in derived:
+                source, mapping, default = derived[dimension]
+                codes, labels[dimension] = map_codes(
+                    columns[source], store.categories(source), mapping, default)
+            else:
+                codes = columns[dimension]
+                labels[dimension] = list(store.categories(dimension))
+            # Les valeurs absentes occupent une case supplémentaire, ignorée ensuite
+            size = len(labels[dimension])
+            keys = np.where(codes >= 0, codes, size)
+            counts[dimension] = counts.get(dimension, 0) + np.bincount(keys, minlength=size + 1)[:size]
+            dimension_sums = sums.setdefault(dimension, {})
+            for measure in measures:
+                dimension_sums[measure] = dimension_sums.get(measure, 0) + np.bincount(
+                    keys, weights=weights[measure], minlength=size + 1)[:size]
+
+    return ExportCube(labels, counts, sums, totals)
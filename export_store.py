@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Stockage colonnaire des déclarations d'exportation.
+
+Le répertoire WEBAPP_PUBLICATION/export_store/ est la source de vérité des
+données d'exportation. Il remplace le chargement complet de
+dynamic_data_enriched.json :
+
+    export_store/
+        manifest.json              métadonnées, filtres, autres clés du JSON,
+                                   schéma, dictionnaires
+        segment_0000/<champ>.npy   une colonne NumPy par champ
+
+Les champs texte sont encodés par dictionnaire (codes int32, -1 pour une
+valeur absente) avec une table de libellés partagée par tous les segments.
+Une colonne réécrite (renumérotation des codes) l'est sous un nouveau nom
+de fichier, <champ>.v<n>.npy, inscrit au manifeste du segment : les
+fichiers en place ne sont jamais modifiés et l'écriture du manifeste est
+le seul point de validation.
+Les champs numériques sont stockés tels quels. Le JSON de la webapp est
+régénéré à partir de ce stockage.
+"""
+
+import argparse
+import json
+import os
+import shutil
+
+import numpy as np
+
+STORE_PATH = 'WEBAPP_PUBLICATION/export_store'
+JSON_PATH = 'WEBAPP_PUBLICATION/dynamic_data_enriched.json'
+MANIFEST = 'manifest.json'
+
+KIND_INT = 'int'
+KIND_FLOAT = 'float'
+KIND_CATEGORY = 'category'
+
+# Listes de filtres de la webapp et champ dont elles sont issues
+FILTER_FIELDS = {
+    'exportateurs': 'exportateur_simple',
+    'produits': 'produit_simple',
+    'emballages': 'emballage_simple',
+    'destinataires': 'destinataire_simple',
+    'declarants': 'declarant_simple',
+}
+
+
+def _write_json_atomic(path, data, **kwargs):
+    """Écrit un fichier JSON via un fichier temporaire puis un renommage"""
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, **kwargs)
+    os.replace(tmp_path, path)
+
+
+def _infer_kind(values):
+    """Détermine le type de stockage d'un champ à partir de ses valeurs"""
+    present = [v for v in values if v is not None]
+    if present and all(isinstance(v, int) and not isinstance(v, bool) for v in present):
+        return KIND_INT if len(present) == len(values) else KIND_FLOAT
+    if present and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+        return KIND_FLOAT
+    return KIND_CATEGORY
+
+
+def _merge_kind(name, kind, values):
+    """Type d'une colonne existante après l'ajout des valeurs d'un lot.
+
+    Une colonne entière devient flottante si le lot contient des décimaux ou
+    des valeurs absentes ; seules les valeurs non numériques d'un champ
+    numérique sont refusées.
+    """
+    if kind == KIND_CATEGORY:
+        return kind
+    if any(v is not None for v in values) and _infer_kind(values) == KIND_CATEGORY:
+        raise ValueError(f"Le champ {name} doit contenir des nombres")
+    if kind == KIND_INT and values and _infer_kind(values) != KIND_INT:
+        return KIND_FLOAT
+    return kind
+
+
+class ExportStore:
+    """Accès aux colonnes du stockage des exportations"""
+
+    def __init__(self, path=STORE_PATH, mmap=False):
+        self.path = path
+        self.mmap = mmap
+        with open(os.path.join(path, MANIFEST), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self._lookups = {}
+        # Fichiers remplacés, supprimés une fois le manifeste enregistré
+        self._obsolete = []
+
+    @property
+    def metadata(self):
+        return self.manifest['metadata']
+
+    @property
+    def filters(self):
+        return self.manifest['filters']
+
+    @property
+    def extra(self):
+        """Clés de premier niveau du JSON d'origine autres que metadata, filters et records"""
+        return self.manifest.get('extra', {})
+
+    @property
+    def fields(self):
+        return [name for name, _ in self.manifest['columns']]
+
+    @property
+    def kinds(self):
+        return dict(self.manifest['columns'])
+
+    @property
+    def segments(self):
+        return self.manifest['segments']
+
+    def __len__(self):
+        return sum(segment['rows'] for segment in self.segments)
+
+    def categories(self, name):
+        """Table des libellés d'un champ texte"""
+        return self.manifest['dictionaries'][name]
+
+    def segment_column(self, segment, name):
+        """Colonne brute (codes pour les champs texte) d'un segment.
+
+        En mode mmap, le fichier est mappé en mémoire en lecture seule.
+        """
+        values = np.load(self._column_path(segment, name, segment.get('versions', {}).get(name)),
+                         mmap_mode='r' if self.mmap else None)
+        if self.kinds[name] == KIND_FLOAT and values.dtype != np.float64:
+            # Segment écrit avant l'élargissement de la colonne en flottant
+            values = values.astype(np.float64)
+        return values
+
+    def _column_path(self, segment, name, version=None):
+        file_name = f'{name}.v{version}.npy' if version else f'{name}.npy'
+        return os.path.join(self.path, segment['name'], file_name)
+
+    def iter_segment_columns(self, names, mask=None):
+        """Colonnes brutes segment par segment (un dictionnaire nom → tableau par segment).
+
+        mask (tableau booléen sur l'ensemble des enregistrements) est découpé
+        selon les segments : seules les lignes retenues sont copiées, les
+        autres colonnes restent mappées en mémoire.
+        """
+        start = 0
+        for segment in self.segments:
+            stop = start + segment['rows']
+            columns = {name: self.segment_column(segment, name) for name in names}
+            if mask is not None:
+                columns = {name: values[mask[start:stop]] for name, values in columns.items()}
+            start = stop
+            yield columns
+
+    def column(self, name, mask=None):
+        """Colonne brute sur l'ensemble des segments, restreinte aux lignes de mask.
+
+        Avec plusieurs segments, la colonne est recopiée dans un seul tableau :
+        les agrégations parcourent plutôt iter_segment_columns.
+        """
+        parts = [columns[name] for columns in self.iter_segment_columns([name], mask)]
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts)
+
+    def _lookup(self, name):
+        """Tableau objet des libellés, -1 correspondant à None"""
+        if name not in self._lookups:
+            lookup = np.empty(len(self.categories(name)) + 1, dtype=object)
+            lookup[:-1] = self.categories(name)
+            lookup[-1] = None
+            self._lookups[name] = lookup
+        return self._lookups[name]
+
+    def decode(self, name, values):
+        """Convertit une colonne brute en valeurs Python"""
+        kind = self.kinds[name]
+        if kind == KIND_CATEGORY:
+            return self._lookup(name)[values]
+        return values
+
+    def to_dataframe(self, columns=None):
+        """Construit un DataFrame directement à partir des colonnes.
+
+        Les champs texte deviennent des colonnes de type category construites
+        depuis les codes du stockage : aucun libellé n'est dupliqué par ligne
+        et les regroupements portent sur des clés entières.
+        """
+        import pandas as pd
+
+        columns = columns or self.fields
+        data = {}
+        for name in columns:
+            values = self.column(name)
+            if self.kinds[name] == KIND_CATEGORY:
+                data[name] = pd.Categorical.from_codes(values, categories=self.categories(name))
+            else:
+                data[name] = values
+        return pd.DataFrame(data)
+
+    def iter_records(self):
+        """Parcourt les enregistrements segment par segment"""
+        kinds = self.kinds
+        for segment in self.segments:
+            decoded = []
+            for name in self.fields:
+                values = self.segment_column(segment, name)
+                if kinds[name] == KIND_CATEGORY:
+                    decoded.append(self.decode(name, values).tolist())
+                elif kinds[name] == KIND_FLOAT:
+                    decoded.append([None if np.isnan(v) else v for v in values.tolist()])
+                else:
+                    decoded.append(values.tolist())
+            for row in zip(*decoded):
+                yield dict(zip(self.fields, row))
+
+    def remap_categories(self, name, func):
+        """Applique func à chaque libellé d'un champ texte et fusionne les doublons.
+
+        Seule la table de libellés est réécrite, sauf si deux libellés fusionnent :
+        les codes des segments sont alors renumérotés dans de nouveaux fichiers,
+        que le manifeste ne référence qu'une fois enregistré (save_manifest).
+        Retourne le nombre de lignes dont la valeur a changé.
+        """
+        old_labels = self.categories(name)
+        new_labels = []
+        index = {}
+        # La dernière case conserve les codes -1 (valeur absente)
+        lut = np.full(len(old_labels) + 1, -1, dtype=np.int32)
+        changed = []
+        for code, label in enumerate(old_labels):
+            target = func(label)
+            if target != label:
+                changed.append(code)
+            if target not in index:
+                index[target] = len(new_labels)
+                new_labels.append(target)
+            lut[code] = index[target]
+
+        renumber = len(new_labels) != len(old_labels)
+        rows_changed = 0
+        rewritten = []
+        for segment in self.segments:
+            codes = self.segment_column(segment, name)
+            rows_changed += int(np.isin(codes, changed).sum())
+            if renumber:
+                version = segment.get('versions', {}).get(name, 0)
+                np.save(self._column_path(segment, name, version + 1), lut[codes])
+                rewritten.append((segment, version))
+
+        # Le manifeste en mémoire n'est modifié qu'une fois tous les fichiers écrits
+        for segment, version in rewritten:
+            segment.setdefault('versions', {})[name] = version + 1
+            self._obsolete.append(self._column_path(segment, name, version))
+        self.manifest['dictionaries'][name] = new_labels
+        self._lookups.pop(name, None)
+        return rows_changed
+
+    def append(self, records, label=None):
+        """Ajoute un lot d'enregistrements sous forme d'un nouveau segment.
+
+        Les segments existants ne sont ni relus ni réécrits : seuls les
+        dictionnaires, les totaux des métadonnées et les listes de filtres
+        sont mis à jour à partir du lot, puis le manifeste est enregistré.
+        Une colonne entière est élargie en flottant si le lot contient des
+        décimaux ou des valeurs absentes.
+        """
+        if label is not None and any(segment['label'] == label for segment in self.segments):
+            raise ValueError(f"Le lot {label} a déjà été ingéré")
+        unknown = sorted({key for record in records for key in record} - set(self.fields))
+        if unknown:
+            raise ValueError(f"Champs inconnus dans le lot : {', '.join(unknown)}")
+        kinds = {}
+        for name, kind in self.manifest['columns']:
+            kinds[name] = _merge_kind(name, kind, [record.get(name) for record in records])
+        # Les segments existants ne sont pas réécrits : une colonne élargie en
+        # flottant y reste entière, convertie à la lecture (segment_column)
+        self.manifest['columns'] = [[name, kinds[name]] for name, _ in self.manifest['columns']]
+
+        write_segment(self.path, self.manifest, records, label)
+
+        metadata = self.metadata
+        metadata['total_weight'] = metadata.get('total_weight', 0) + sum(r.get('poids_net') or 0 for r in records)
+        metadata['total_value'] = metadata.get('total_value', 0) + sum(r.get('valfob') or 0 for r in records)
+        metadata['total_records'] = metadata.get('total_records', 0) + len(records)
+
+        for filter_name, field in FILTER_FIELDS.items():
+            if filter_name not in self.filters:
+                continue
+            new_values = {r.get(field) for r in records if r.get(field)} - set(self.filters[filter_name])
+            if new_values:
+                self.filters[filter_name] = sorted(set(self.filters[filter_name]) | new_values)
+
+        self.save_manifest()
+
+    def save_manifest(self):
+        """Enregistre le manifeste de manière atomique, puis supprime les fichiers remplacés"""
+        self._lookups = {}
+        _write_json_atomic(os.path.join(self.path, MANIFEST), self.manifest, indent=2)
+        for path in self._obsolete:
+            if os.path.exists(path):
+                os.remove(path)
+        self._obsolete = []
+
+
+def map_codes(codes, categories, mapping, default):
+    """Applique un dictionnaire de correspondance à une colonne encodée.
+
+    La correspondance est calculée une fois par libellé puis propagée aux
+    codes ; les valeurs absentes ou non trouvées prennent la valeur default.
+    Retourne les nouveaux codes et leur table de libellés.
+    """
+    labels = [default]
+    index = {default: 0}
+    # La dernière case reçoit les codes -1 (valeur absente)
+    lut = np.zeros(len(categories) + 1, dtype=np.int32)
+    for code, category in enumerate(categories):
+        target = mapping.get(category, default)
+        if target not in index:
+            index[target] = len(labels)
+            labels.append(target)
+        lut[code] = index[target]
+    return lut[codes], labels
+
+
+def _encode_segment(records, columns, dictionaries):
+    """Encode une liste d'enregistrements en colonnes NumPy"""
+    arrays = {}
+    for name, kind in columns:
+        values = [record.get(name) for record in records]
+        if kind == KIND_CATEGORY:
+            labels = dictionaries.setdefault(name, [])
+            index = {label: code for code, label in enumerate(labels)}
+            codes = np.empty(len(values), dtype=np.int32)
+            for i, value in enumerate(values):
+                if value is None:
+                    codes[i] = -1
+                    continue
+                value = str(value)
+                code = index.get(value)
+                if code is None:
+                    code = index[value] = len(labels)
+                    labels.append(value)
+                codes[i] = code
+            arrays[name] = codes
+        elif kind == KIND_INT:
+            arrays[name] = np.asarray(values, dtype=np.int64)
+        else:
+            arrays[name] = np.asarray([np.nan if v is None else v for v in values], dtype=np.float64)
+    return arrays
+
+
+def write_segment(path, manifest, records, label=None):
+    """Ajoute un segment de colonnes au stockage et l'inscrit au manifeste"""
+    name = f"segment_{len(manifest['segments']):04d}"
+    arrays = _encode_segment(records, manifest['columns'], manifest['dictionaries'])
+    os.makedirs(os.path.join(path, name), exist_ok=True)
+    for column, values in arrays.items():
+        np.save(os.path.join(path, name, f'{column}.npy'), values)
+    manifest['segments'].append({'name': name, 'rows': len(records), 'label': label})
+    return name
+
+
+def convert_json(json_path=JSON_PATH, store_path=STORE_PATH):
+    """Convertit dynamic_data_enriched.json en stockage colonnaire.
+
+    Le stockage est construit dans un répertoire temporaire qui remplace
+    ensuite l'ancien : aucun segment d'une conversion précédente ne
+    subsiste et un stockage partiel n'est jamais visible à store_path.
+    """
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    records = data['records']
+
+    fields = []
+    for record in records:
+        for key in record:
+            if key not in fields:
+                fields.append(key)
+
+    manifest = {
+        'metadata': data.get('metadata', {}),
+        'filters': data.get('filters', {}),
+        'extra': {key: value for key, value in data.items() if key not in ('metadata', 'filters', 'records')},
+        'columns': [[name, _infer_kind([r.get(name) for r in records])] for name in fields],
+        'dictionaries': {},
+        'segments': [],
+    }
+    tmp_path = f'{store_path}.tmp'
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    write_segment(tmp_path, manifest, records, label='initial')
+    _write_json_atomic(os.path.join(tmp_path, MANIFEST), manifest, indent=2)
+
+    old_path = f'{store_path}.old'
+    shutil.rmtree(old_path, ignore_errors=True)
+    if os.path.exists(store_path):
+        os.replace(store_path, old_path)
+    os.replace(tmp_path, store_path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    return ExportStore(store_path)
+
+
+def open_store(store_path=STORE_PATH, json_path=JSON_PATH, mmap=False):
+    """Ouvre le stockage, en le créant depuis le JSON lors de la première utilisation"""
+    if not os.path.exists(os.path.join(store_path, MANIFEST)):
+        print(f'Conversion de {json_path} vers {store_path}...')
+        convert_json(json_path, store_path)
+    return ExportStore(store_path, mmap=mmap)
+
+
+def export_json(store, json_path=JSON_PATH):
+    """Régénère le JSON de la webapp à partir du stockage.
+
+    Les enregistrements sont écrits au fil de l'eau, un par ligne, dans un
+    fichier temporaire renommé à la fin : la mémoire utilisée ne dépend pas
+    du nombre d'enregistrements et le fichier publié n'est jamais partiel.
+    """
+    tmp_path = f'{json_path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write('{"metadata": ')
+        json.dump(store.metadata, f, ensure_ascii=False)
+        f.write(',\n"filters": ')
+        json.dump(store.filters, f, ensure_ascii=False)
+        for key, value in store.extra.items():
+            f.write(f',\n{json.dumps(key, ensure_ascii=False)}: ')
+            json.dump(value, f, ensure_ascii=False)
+        f.write(',\n"records": [')
+        for i, record in enumerate(store.iter_records()):
+            f.write(',\n' if i else '\n')
+            f.write(json.dumps(record, ensure_ascii=False))
+        f.write('\n]}\n')
+    os.replace(tmp_path, json_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stockage colonnaire des exportations")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    convert_parser = subparsers.add_parser('convert', help="Convertit le JSON en stockage colonnaire")
+    convert_parser.add_argument('--json', default=JSON_PATH)
+    convert_parser.add_argument('--store', default=STORE_PATH)
+
+    export_parser = subparsers.add_parser('export-json',
+                                          help="Régénère les données de la webapp (JSON, colonnes et cube)")
+    export_parser.add_argument('--json', default=JSON_PATH)
+    export_parser.add_argument('--store', default=STORE_PATH)
+
+    ingest_parser = subparsers.add_parser('ingest', help="Ajoute un lot mensuel de déclarations")
+    ingest_parser.add_argument('batches', nargs='+', help="Fichiers JSON du lot (ports ABJ et SPY)")
+    ingest_parser.add_argument('--label', required=True, help="Identifiant du lot, par exemple 2025-08")
+    ingest_parser.add_argument('--store', default=STORE_PATH)
+    ingest_parser.add_argument('--export-json', action='store_true',
+                               help="Régénère aussi les données de la webapp (JSON, colonnes et cube)")
+    ingest_parser.add_argument('--json', default=JSON_PATH)
+
+    args = parser.parse_args()
+    # Import différé : publish_webapp dépend de ce module
+    from publish_webapp import publish_webapp_data
+
+    if args.command == 'convert':
+        store = convert_json(args.json, args.store)
+        print(f'✅ {len(store):,} enregistrements convertis dans {args.store}')
+    elif args.command == 'ingest':
+        records = []
+        for batch_path in args.batches:
+            with open(batch_path, 'r', encoding='utf-8') as f:
+                batch = json.load(f)
+            records.extend(batch['records'] if isinstance(batch, dict) else batch)
+        store = ExportStore(args.store)
+        try:
+            store.append(records, label=args.label)
+        except ValueError as error:
+            parser.exit(1, f'❌ {error}\n')
+        print(f'✅ Lot {args.label} : {len(records):,} enregistrements ajoutés ({len(store):,} au total)')
+        if args.export_json:
+            publish_webapp_data(store, args.json)
+            print(f'✅ {args.json}, colonnes et cube de la webapp régénérés')
+    else:
+        store = ExportStore(args.store)
+        publish_webapp_data(store, args.json)
+        print(f'✅ {args.json}, colonnes et cube de la webapp régénérés ({len(store):,} enregistrements)')
+
+
+if __name__ == '__main__':
+    main()
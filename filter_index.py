@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Index bitmap des filtres de la webapp.
+
+Pour chaque valeur d'un champ filtrable, l'index conserve l'ensemble des
+lignes qui la portent, sous la forme la plus compacte, à la manière des
+conteneurs roaring : liste triée d'indices uint32 little-endian lorsque la
+valeur est rare, bitset sinon (np.packbits, bit i de l'octet i // 8 dans
+l'ordre little-endian). Un filtre combiné est l'intersection des bitsets,
+dont le coût ne dépend que du nombre de lignes divisé par huit.
+
+Format sérialisé (JSON, contenus en base64) :
+
+    {"rows": n, "fields": {champ: {libellé: ["a" | "b", base64]}}}
+
+La webapp lit le même format (queryFilterIndex dans index.html).
+"""
+
+import base64
+
+import numpy as np
+
+from export_store import FILTER_FIELDS
+
+ARRAY = 'a'
+BITSET = 'b'
+
+
+def _bitset_bytes(size):
+    return (size + 7) // 8
+
+
+def encode_rows(rows, size):
+    """Encode un ensemble trié de lignes dans le conteneur le plus compact"""
+    if 4 * len(rows) < _bitset_bytes(size):
+        data = np.asarray(rows, dtype='<u4').tobytes()
+        return [ARRAY, base64.b64encode(data).decode('ascii')]
+    mask = np.zeros(size, dtype=bool)
+    mask[rows] = True
+    data = np.packbits(mask, bitorder='little').tobytes()
+    return [BITSET, base64.b64encode(data).decode('ascii')]
+
+
+def decode_bits(container, size):
+    """Bitset (octets packés) d'un conteneur"""
+    kind, data = container
+    raw = np.frombuffer(base64.b64decode(data), dtype=np.uint8)
+    if kind == BITSET:
+        return raw
+    mask = np.zeros(size, dtype=bool)
+    mask[raw.view('<u4')] = True
+    return np.packbits(mask, bitorder='little')
+
+
+class FilterIndex:
+    """Index valeur → lignes des champs filtrables"""
+
+    def __init__(self, size, fields):
+        self.size = size
+        self.fields = fields
+
+    @classmethod
+    def from_codes(cls, columns, dictionaries):
+        """Construit l'index à partir des codes des champs texte.
+
+        columns associe à chaque champ son tableau de codes (-1 pour une
+        valeur absente, non indexée) et dictionaries ses libellés.
+        """
+        size = len(next(iter(columns.values()), ()))
+        fields = {}
+        for field, codes in columns.items():
+            codes = np.asarray(codes)
+            labels = dictionaries[field]
+            # Tri stable : les lignes de chaque valeur restent croissantes
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(labels) + 1))
+            fields[field] = {
+                labels[code]: encode_rows(order[bounds[code]:bounds[code + 1]], size)
+                for code in range(len(labels))
+                if bounds[code + 1] > bounds[code]
+            }
+        return cls(size, fields)
+
+    @classmethod
+    def from_store(cls, store, fields=None):
+        """Index des enregistrements du stockage colonnaire"""
+        fields = [f for f in (fields or FILTER_FIELDS.values()) if f in store.kinds]
+        return cls.from_codes({f: store.column(f) for f in fields},
+                              {f: store.categories(f) for f in fields})
+
+    @classmethod
+    def from_payload(cls, payload):
+        return cls(payload['rows'], payload['fields'])
+
+    def to_payload(self):
+        return {'rows': self.size, 'fields': self.fields}
+
+    def bits(self, field, value):
+        """Bitset des lignes où le champ vaut value"""
+        container = self.fields.get(field, {}).get(value)
+        if container is None:
+            return np.zeros(_bitset_bytes(self.size), dtype=np.uint8)
+        return decode_bits(container, self.size)
+
+    def query(self, filters):
+        """Lignes (indices croissants) satisfaisant tous les filtres champ → valeur"""
+        filters = {field: value for field, value in filters.items() if value}
+        if not filters:
+            return np.arange(self.size)
+        result = None
+        for field, value in filters.items():
+            bits = self.bits(field, value)
+            result = bits if result is None else result & bits
+        return np.flatnonzero(np.unpackbits(result, count=self.size, bitorder='little'))
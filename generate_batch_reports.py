@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Génération par lots de rapports restreints à un périmètre.
+
+Un fichier de spécification JSON décrit les rapports à produire :
+
+    {
+      "sections": ["titre", "resume", "destinations"],
+      "rapports": [
+        {"nom": "S3C", "filtres": {"exportateur_simple": "S3C"}},
+        {"nom": "Europe", "filtres": {"destination": ["NL", "BE", "DE", "FR", "ES"]}},
+        {"par": "port"},
+        {"par": "exportateur_simple", "top": 20, "filtres": {"produit_simple": "FEVES"}}
+      ]
+    }
+
+Une entrée "par" produit un rapport par valeur du champ (les "top"
+premières en poids), combinée à ses éventuels filtres. "sections" est
+facultatif (rapport complet par défaut, sans les annexes détaillées) et
+peut être précisé par rapport. Deux rapports dont les noms donnent le même
+nom de fichier (« SOC A/B » et « SOC A&B ») sont distingués par un
+suffixe _2, _3...
+
+Les données, le modèle de document et les graphiques indépendants du
+périmètre (capacités, risques) sont préparés une seule fois ; chaque
+processus du pool ouvre le stockage en mémoire mappée, partagé par le
+cache du système, et ne recalcule que le cube et les graphiques de son
+périmètre.
+"""
+
+import argparse
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from generate_detailed_cocoa_report import CHART_GROUPS, REPORT_SECTIONS, DetailedCocoaReportGenerator
+from query_export import query
+from report_charts import render_charts
+
+OUTPUT_DIR = 'rapports'
+
+# Graphiques identiques pour tous les périmètres, tracés une seule fois
+SHARED_CHARTS = CHART_GROUPS['capacity_chart_data'] + CHART_GROUPS['risk_chart_data']
+
+# Générateur propre à chaque processus du lot
+_generator = None
+
+
+def load_spec(path, store):
+    """Lit la spécification et retourne la liste des rapports (nom, filtres, sections).
+
+    Les périmètres sans aucune transaction sont signalés et écartés ; les
+    noms sont rendus uniques au niveau des fichiers produits.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        spec = json.load(f)
+
+    jobs = []
+    used = set()
+    for entry in spec.get('rapports', []):
+        filters = entry.get('filtres', {})
+        sections = entry.get('sections', spec.get('sections'))
+        unknown = set(sections or []) - set(REPORT_SECTIONS)
+        if unknown:
+            raise ValueError(f"Sections inconnues : {', '.join(sorted(unknown))}")
+        if 'par' in entry:
+            by = entry['par']
+            for group in query(store, by, filters, entry.get('top'))['groups']:
+                name = '_'.join([entry.get('nom', by), group[by]])
+                jobs.append((_unique_name(name, used), dict(filters, **{by: group[by]}), sections))
+        elif 'nom' not in entry:
+            raise ValueError(f"Rapport sans nom ni champ 'par' : {entry}")
+        elif query(store, filters=filters)['total']['transactions'] == 0:
+            print(f"⚠️  {entry['nom']} : aucune transaction dans le périmètre, rapport ignoré")
+        else:
+            jobs.append((_unique_name(entry['nom'], used), filters, sections))
+    return jobs
+
+
+def safe_name(name):
+    """Nom réduit aux caractères sûrs pour un nom de fichier"""
+    return re.sub(r'[^\w.-]+', '_', name).strip('_')
+
+
+def _unique_name(name, used):
+    """name, suffixé de _2, _3... si son nom de fichier est déjà pris (casse ignorée)"""
+    candidate = name
+    suffix = 1
+    while safe_name(candidate).lower() in used:
+        suffix += 1
+        candidate = f'{name}_{suffix}'
+    if candidate != name:
+        print(f"⚠️  {name} : nom de fichier déjà utilisé, rapport renommé {candidate}")
+    used.add(safe_name(candidate).lower())
+    return candidate
+
+
+def report_path(output_dir, name):
+    """Chemin du rapport, le nom étant réduit aux caractères sûrs"""
+    return os.path.join(output_dir, f'Rapport_Cacao_CI_{safe_name(name)}.docx')
+
+
+def _init_worker(use_cache, shared_images):
+    """Prépare le générateur du processus avec les graphiques communs"""
+    global _generator
+    _generator = DetailedCocoaReportGenerator(use_cache=use_cache, chart_workers=1, section_workers=1,
+                                              mmap=True)
+    _generator.chart_images.update(shared_images)
+
+
+def _generate(job):
+    name, filters, sections, path = job
+    _generator.set_scope(filters)
+    return _generator.generate_report(sections, filename=path)
+
+
+def generate_batch(generator, jobs, output_dir=OUTPUT_DIR, workers=None):
+    """Génère les rapports du lot et retourne les chemins produits, dans l'ordre"""
+    os.makedirs(output_dir, exist_ok=True)
+    use_cache = generator.chart_cache is not None
+    shared_images = render_charts(generator.build_chart_data(SHARED_CHARTS),
+                                  max_workers=workers, cache=generator.chart_cache)
+
+    tasks = [(name, filters, sections, report_path(output_dir, name)) for name, filters, sections in jobs]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        _init_worker(use_cache, shared_images)
+        return [_generate(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), initializer=_init_worker,
+                             initargs=(use_cache, shared_images)) as executor:
+        return list(executor.map(_generate, tasks))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère un lot de rapports restreints à un périmètre")
+    parser.add_argument('spec', help="Spécification JSON des rapports à produire")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR)
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Nombre de processus (défaut : nombre de cœurs)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Recalcule agrégats et graphiques sans lire ni écrire le cache")
+    args = parser.parse_args()
+
+    generator = DetailedCocoaReportGenerator(use_cache=not args.no_cache, mmap=True)
+    try:
+        jobs = load_spec(args.spec, generator.export_store)
+    except ValueError as error:
+        parser.exit(1, f'❌ {error}\n')
+
+    paths = generate_batch(generator, jobs, args.output_dir, args.workers)
+    print(f'✅ {len(paths)} rapports générés dans {args.output_dir}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,37 +1,148 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import argparse
 import json
-import pandas as pd
 from docx import Document
 from docx.shared import Inches, Pt, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_PARAGRAPH_ALIGNMENT
 from docx.enum.style import WD_STYLE_TYPE
 from docx.oxml.ns import qn
 from docx.oxml import OxmlElement
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime
+from functools import cached_property
+from concurrent.futures import ProcessPoolExecutor
+import io
 import os
-import numpy as np
 
-# Configuration
-plt.style.use('seaborn-v0_8-whitegrid')
-plt.rcParams['font.family'] = 'Arial'
-plt.rcParams['font.size'] = 11
-plt.rcParams['figure.figsize'] = (10, 8)
-plt.rcParams['figure.dpi'] = 300
+from disk_cache import CACHE_ROOT, DiskCache, fingerprint
+from docx_merge import append_document
+from docx_tables import INDEX, RANK, add_frame_table, add_table
+from export_cube import build_cube
+from export_store import open_store
+from query_export import build_mask, query
+from report_charts import render_charts, save_charts
+from report_statistics import ReportStatistics, capacity, select_companies, utilization_rate
+from stage_profiler import StageProfiler
+
+# Mapping des codes pays
+COUNTRY_MAPPING = {
+    'NL': 'Pays-Bas', 'FR': 'France', 'US': 'États-Unis', 'ES': 'Espagne',
+    'BE': 'Belgique', 'DE': 'Allemagne', 'MY': 'Malaisie', 'GB': 'Royaume-Uni',
+    'CA': 'Canada', 'EE': 'Estonie', 'IT': 'Italie', 'ZA': 'Afrique du Sud',
+    'TR': 'Turquie', 'PL': 'Pologne', 'BR': 'Brésil', 'PT': 'Portugal',
+    'ID': 'Indonésie', 'AU': 'Australie', 'CN': 'Chine', 'MX': 'Mexique',
+    'IL': 'Israël', 'BG': 'Bulgarie', 'MA': 'Maroc', 'JP': 'Japon',
+    'EG': 'Égypte', 'QA': 'Qatar', 'LT': 'Lituanie', 'CM': 'Cameroun',
+    'UY': 'Uruguay', 'SN': 'Sénégal', 'RU': 'Russie', 'HR': 'Croatie'
+}
+
+# Régions de destination (codes pays), pour la répartition régionale des exportations
+REGIONS = {
+    'Union européenne': ['NL', 'BE', 'FR', 'DE', 'ES', 'IT', 'PT', 'EE', 'PL', 'BG', 'LT', 'HR', 'AT',
+                         'CZ', 'DK', 'FI', 'GR', 'HU', 'IE', 'LU', 'LV', 'MT', 'RO', 'SE', 'SI', 'SK', 'CY'],
+    'Europe hors UE': ['GB', 'CH', 'NO', 'RU', 'UA', 'TR', 'RS'],
+    'Amériques': ['US', 'CA', 'MX', 'BR', 'UY', 'AR', 'CL', 'CO', 'PE', 'EC', 'DO', 'GT', 'CR', 'PA'],
+    'Asie': ['MY', 'ID', 'CN', 'JP', 'KR', 'IN', 'SG', 'TH', 'VN', 'PH', 'TW', 'HK'],
+    'Moyen-Orient': ['IL', 'QA', 'AE', 'SA', 'KW', 'OM', 'BH', 'JO', 'LB'],
+    'Afrique': ['ZA', 'MA', 'EG', 'CM', 'SN', 'NG', 'GH', 'DZ', 'TN', 'KE'],
+    'Océanie': ['AU', 'NZ'],
+}
+REGION_MAPPING = {code: region for region, codes in REGIONS.items() for code in codes}
+EUROPE = ['Union européenne', 'Europe hors UE']
+# Part européenne (%) à partir de laquelle le résumé parle de forte concentration
+EUROPE_CONCENTRATION_SHARE = 50
+
+# Dimensions agrégées pour la section 3 et les chiffres clés
+EXPORT_DIMENSIONS = ['country_name', 'produit_simple', 'port', 'emballage_simple',
+                     'declarant_simple', 'exportateur_simple', 'destinataire_simple',
+                     'destination', 'region']
+
+# Annexes détaillées : dimension listée en entier → (titre, libellé de la colonne)
+ANNEX_TABLES = {
+    'exportateur_simple': ('Liste complète des exportateurs', 'Exportateur'),
+    'declarant_simple': ('Liste complète des déclarants', 'Déclarant'),
+    'destinataire_simple': ('Liste complète des destinataires', 'Destinataire'),
+}
+
+BROYAGE_PATH = 'WEBAPP_PUBLICATION/broyage_data.json'
+
+# Cache des agrégats, invalidé par l'empreinte des données d'entrée
+AGGREGATE_CACHE_DIR = os.path.join(CACHE_ROOT, 'aggregats')
+AGGREGATE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+AGGREGATE_CACHE_VERSION = '1'
+
+# Cache des graphiques, indexé par l'empreinte des données de chaque figure
+CHART_CACHE_DIR = os.path.join(CACHE_ROOT, 'graphiques')
+CHART_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Graphiques regroupés selon la méthode qui prépare leurs données
+CHART_GROUPS = {
+    'capacity_chart_data': ['capacity_comparison', 'capacity_evolution'],
+    'export_chart_data': ['destinations_pie', 'products_bar', 'ports_donut', 'packaging_bar',
+                          'declarants_bar', 'exporters_pie'],
+    'risk_chart_data': ['usa_risk_radar'],
+}
+
+# Sections du rapport, dans l'ordre : nom → (méthode, agrégats requis, graphiques insérés)
+REPORT_SECTIONS = {
+    'titre': ('add_title_page', [], []),
+    'sommaire': ('add_table_of_contents', [], []),
+    'resume': ('add_executive_summary', ['cube'], []),
+    'zes': ('section_1_detailed_zes', [], []),
+    'transformation': ('section_2_detailed_transformation', [], ['capacity_comparison', 'capacity_evolution']),
+    'destinations': ('section_3_detailed_destinations', ['cube'],
+                     ['destinations_pie', 'products_bar', 'ports_donut', 'packaging_bar',
+                      'declarants_bar', 'exporters_pie']),
+    'risques': ('section_4_detailed_risks', ['cube'], ['usa_risk_radar']),
+    'conclusions': ('add_conclusions', [], []),
+    'annexes': ('add_annexes', [], []),
+    'annexes_detaillees': ('add_detailed_annexes', ['cube'], []),
+}
+
+# Sections du rapport complet ; les annexes détaillées (audit) sont à demander explicitement
+DEFAULT_SECTIONS = [name for name in REPORT_SECTIONS if name != 'annexes_detaillees']
+
+# Générateur propre à chaque processus de construction des sections
+_section_generator = None
+
+
+def _init_section_worker(scope, aggregates, chart_images, profiling):
+    """Prépare un générateur avec le périmètre, les agrégats et graphiques du processus principal.
+
+    profiling : (enabled, trace_allocations) du profileur du processus principal.
+    """
+    global _section_generator
+    _section_generator = DetailedCocoaReportGenerator(use_cache=False, scope=scope,
+                                                      profiler=StageProfiler(*profiling))
+    _section_generator.aggregates = aggregates
+    _section_generator.chart_images = chart_images
+
+
+def _build_section_bytes(name):
+    """Construit une section dans un processus ; retourne le fragment .docx et ses mesures"""
+    profiler = _section_generator.profiler
+    profiler.stages = []
+    buffer = io.BytesIO()
+    _section_generator.build_section(name).save(buffer)
+    return buffer.getvalue(), profiler.stages
 
-# Couleurs professionnelles
-COLORS = ['#2c3e50', '#34495e', '#3498db', '#2980b9', '#16a085', 
-          '#27ae60', '#f39c12', '#e67e22', '#9b59b6', '#8e44ad']
 
 class DetailedCocoaReportGenerator:
-    def __init__(self):
-        self.doc = Document()
-        self.setup_document()
-        self.setup_styles()
-        self.load_data()
+    def __init__(self, use_cache=True, chart_workers=None, charts_dir=None, section_workers=None,
+                 scope=None, mmap=False, profiler=None):
+        self.profiler = profiler or StageProfiler(enabled=False)
+        self.doc = None
+        self.aggregate_cache = DiskCache(AGGREGATE_CACHE_DIR, AGGREGATE_CACHE_MAX_BYTES) if use_cache else None
+        self.chart_cache = DiskCache(CHART_CACHE_DIR, CHART_CACHE_MAX_BYTES) if use_cache else None
+        self.aggregates = None
+        self.chart_workers = chart_workers
+        self.section_workers = section_workers
+        self.charts_dir = charts_dir
+        self.chart_images = {}
+        self.mmap = mmap
+        # Modèle, données et périmètre sont préparés à la première utilisation
+        self.set_scope(scope)
         
     def setup_document(self):
         """Configure les marges et paramètres du document"""
@@ -161,13 +272,239 @@ class DetailedCocoaReportGenerator:
         style.paragraph_format.space_before = Pt(12)
         style.paragraph_format.space_after = Pt(6)
         
-    def load_data(self):
-        """Charge les données depuis les fichiers JSON"""
-        with open('WEBAPP_PUBLICATION/broyage_data.json', 'r', encoding='utf-8') as f:
-            self.broyage_data = json.load(f)
+    @cached_property
+    def template(self):
+        """Modèle mis en page et stylé (octets .docx), copié pour chaque document"""
+        main_doc = self.doc
+        self.doc = Document()
+        try:
+            with self.profiler.stage('modele'):
+                self.setup_document()
+                self.setup_styles()
+                buffer = io.BytesIO()
+                self.doc.save(buffer)
+                return buffer.getvalue()
+        finally:
+            self.doc = main_doc
+            
+    @cached_property
+    def broyage_data(self):
+        """Capacités de broyage par société (JSON)"""
+        with self.profiler.stage('chargement_capacites'):
+            with open(BROYAGE_PATH, 'r', encoding='utf-8') as f:
+                return json.load(f)
+            
+    @cached_property
+    def companies(self):
+        """Sociétés de broyage, hors lignes de total et d'estimation de récolte"""
+        return select_companies(self.broyage_data)
+            
+    @cached_property
+    def statistics(self):
+        """Statistiques dérivées (capacités, exportations) partagées par les sections"""
+        return ReportStatistics(self.companies, lambda: self.export_metadata,
+                                lambda: self.get_aggregates()['cube'])
+            
+    @cached_property
+    def export_store(self):
+        """Exportations, lues depuis le stockage colonnaire"""
+        with self.profiler.stage('chargement_exportations'):
+            return open_store(mmap=self.mmap)
+            
+    @cached_property
+    def scope_mask(self):
+        """Masque des exportations du périmètre (None sans périmètre)"""
+        with self.profiler.stage('perimetre'):
+            return build_mask(self.export_store, self.scope)
+            
+    @cached_property
+    def export_metadata(self):
+        """Totaux des exportations du périmètre"""
+        if self.scope_mask is None:
+            return self.export_store.metadata
+        total = query(self.export_store, filters=self.scope)['total']
+        return dict(self.export_store.metadata, total_weight=total['poids_net'],
+                    total_value=total['valfob'], total_records=total['transactions'])
+            
+    def set_scope(self, scope):
+        """Restreint les exportations analysées (champ → valeur ou liste de valeurs)"""
+        self.scope = dict(scope or {})
+        # Masque et totaux recalculés à la demande pour le nouveau périmètre ;
+        # les statistiques de capacité, indépendantes du périmètre, sont conservées
+        self.__dict__.pop('scope_mask', None)
+        self.__dict__.pop('export_metadata', None)
+        if 'statistics' in self.__dict__:
+            self.statistics.reset_exports()
+        self.aggregates = None
+        for name in CHART_GROUPS['export_chart_data']:
+            self.chart_images.pop(name, None)
+            
+    def scope_label(self):
+        """Description lisible du périmètre des exportations"""
+        return ' ; '.join(
+            f"{field} = {', '.join(value) if isinstance(value, (list, tuple)) else value}"
+            for field, value in self.scope.items())
+            
+    def new_document(self):
+        """Nouveau document mis en page et stylé, copié du modèle"""
+        return Document(io.BytesIO(self.template))
+            
+    def build_export_cube(self):
+        """Agrège les exportations sur toutes les dimensions de la section 3"""
+        return build_cube(self.export_store, EXPORT_DIMENSIONS,
+                          derived={'country_name': ('destination', COUNTRY_MAPPING, 'Autres'),
+                                   'region': ('destination', REGION_MAPPING, 'Autres')},
+                          mask=self.scope_mask)
+            
+    def compute_aggregates(self):
+        """Calcule l'ensemble des agrégats utilisés par le rapport"""
+        with self.profiler.stage('cube'):
+            return {'cube': self.build_export_cube()}
+            
+    def get_aggregates(self):
+        """Retourne les agrégats, depuis le cache disque si les données n'ont pas changé"""
+        if self.aggregates is not None:
+            return self.aggregates
+            
+        if self.aggregate_cache is None:
+            self.aggregates = self.compute_aggregates()
+            return self.aggregates
+            
+        salt = json.dumps([AGGREGATE_CACHE_VERSION, EXPORT_DIMENSIONS, COUNTRY_MAPPING, REGION_MAPPING, self.scope],
+                          ensure_ascii=False, sort_keys=True)
+        key = fingerprint([BROYAGE_PATH, self.export_store.path], salt=salt)
+        with self.profiler.stage('cache'):
+            self.aggregates = self.aggregate_cache.get(key)
+        if self.aggregates is None:
+            self.aggregates = self.compute_aggregates()
+            with self.profiler.stage('cache'):
+                self.aggregate_cache.put(key, self.aggregates)
+        return self.aggregates
+            
+    def build_chart_data(self, names=None):
+        """Prépare les séries de données des graphiques demandés (tous par défaut)"""
+        data = {}
+        for method, charts in CHART_GROUPS.items():
+            wanted = [name for name in charts if names is None or name in names]
+            if wanted:
+                group = getattr(self, method)()
+                data.update((name, group[name]) for name in wanted)
+        return data
+            
+    def capacity_chart_data(self):
+        """Données des graphiques de capacités de broyage"""
+        stats = self.statistics
+        top_companies = stats.top_companies(10)
+        
+        return {
+            'capacity_comparison': {
+                'names': [c['societe'] for c in top_companies],
+                'installed': [capacity(c, 'capacite_installee')/1000 for c in top_companies],
+                'used': [capacity(c, 'capacite_utilisee')/1000 for c in top_companies],
+            },
+            'capacity_evolution': {
+                'years': ['2024', '2027-28', '2029-30'],
+                'capacities': [stats.total_installed/1000, stats.total_2027/1000, stats.total_2030/1000],
+            },
+        }
+            
+    def export_chart_data(self):
+        """Données des graphiques de la section 3, tirées du cube des exportations"""
+        cube = self.get_aggregates()['cube']
+        country_stats = cube.rollup('country_name', top=10)
+        product_stats = cube.rollup('produit_simple', top=5)
+        port_stats = cube.rollup('port')
+        packaging_stats = cube.rollup('emballage_simple', top=4)
+        declarant_stats = cube.rollup('declarant_simple', top=10)
+        exporter_stats = cube.rollup('exportateur_simple', top=10)
+        
+        return {
+            'destinations_pie': {
+                'labels': list(country_stats.index[:8]) + ['Autres'],
+                'weights': country_stats['poids_net'].iloc[:8].tolist() + [float(country_stats['poids_net'].iloc[8:].sum())],
+            },
+            'products_bar': {
+                'labels': list(product_stats.index[::-1]),
+                'volumes': (product_stats['poids_net'][::-1] / 1000).tolist(),
+            },
+            'ports_donut': {
+                'labels': list(port_stats.index),
+                'sizes': port_stats['poids_net'].tolist(),
+                'total_weight': cube.total('poids_net'),
+            },
+            'packaging_bar': {
+                'labels': list(packaging_stats.index),
+                'volumes': (packaging_stats['poids_net'] / 1000).tolist(),
+            },
+            'declarants_bar': {
+                'labels': list(declarant_stats.index),
+                'volumes': (declarant_stats['poids_net'] / 1000).tolist(),
+            },
+            'exporters_pie': {
+                'labels': list(exporter_stats.index[:5]) + ['Autres'],
+                'volumes': exporter_stats['poids_net'].iloc[:5].tolist() + [float(exporter_stats['poids_net'].iloc[5:].sum())],
+            },
+        }
             
-        with open('WEBAPP_PUBLICATION/dynamic_data_enriched.json', 'r', encoding='utf-8') as f:
-            self.export_data = json.load(f)
+    def risk_chart_data(self):
+        """Données des graphiques de la section 4"""
+        return {
+            'usa_risk_radar': {
+                'title': 'Profil de risque - États-Unis',
+                'categories': ['Réglementaire', 'Change', 'Économique', 'Géopolitique', 'Sectoriel'],
+                'scores': [2, 4, 3, 4, 2],
+            },
+        }
+            
+    def build_section(self, name):
+        """Construit une section du rapport dans un document séparé"""
+        method = REPORT_SECTIONS[name][0]
+        main_doc = self.doc
+        self.doc = self.new_document()
+        try:
+            with self.profiler.stage(name):
+                getattr(self, method)()
+            return self.doc
+        finally:
+            self.doc = main_doc
+            
+    def build_sections(self, names):
+        """Construit les sections demandées, dans ce processus par défaut.
+
+        Les agrégats et les graphiques sont déjà calculés : les sections ne
+        font que de la mise en forme, et un processus supplémentaire coûte
+        plus (import, générateur, copie des graphiques) qu'il ne rapporte,
+        sauf pour de très gros documents. Avec section_workers > 1, elles
+        sont construites par un pool de processus.
+
+        Retourne les fragments dans l'ordre de names : documents construits
+        sur place, ou contenus .docx produits par les processus.
+        """
+        max_workers = self.section_workers or 1
+        if max_workers == 1 or len(names) <= 1:
+            return [self.build_section(name) for name in names]
+        profiling = (self.profiler.enabled, self.profiler.trace_allocations)
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(names)), initializer=_init_section_worker,
+                                 initargs=(self.scope, self.aggregates, self.chart_images, profiling)) as executor:
+            results = list(executor.map(_build_section_bytes, names))
+        # Les mesures des processus sont rattachées à l'étape en cours (sections)
+        for _, stages in results:
+            self.profiler.merge(stages)
+        return [fragment for fragment, _ in results]
+            
+    def add_ranking_table(self, stats, label, total_weight):
+        """Tableau de classement (rang, libellé, volume, part, transactions) d'un agrégat"""
+        add_frame_table(self.doc, stats, [
+            ('Rang', RANK, '{}'),
+            (label, INDEX, '{}'),
+            ('Volume (tonnes)', lambda stats: stats['poids_net'] / 1000, '{:,.0f}'),
+            ('Part (%)', lambda stats: stats['poids_net'] / total_weight * 100, '{:.1f}%'),
+            ('Nb Transactions', 'id', '{:,}'),
+        ], style='Light Shading Accent 1')
+            
+    def add_chart(self, name, width):
+        """Insère un graphique pré-rendu (PNG en mémoire) dans le document"""
+        self.doc.add_picture(io.BytesIO(self.chart_images[name]), width=width)
             
     def add_title_page(self):
         """Ajoute la page de titre professionnelle"""
@@ -205,6 +542,15 @@ class DetailedCocoaReportGenerator:
         period2.runs[0].font.size = Pt(16)
         period2.runs[0].font.name = 'Arial'
         
+        # Périmètre d'un rapport restreint
+        if self.scope:
+            scope = self.doc.add_paragraph()
+            scope.text = f'Périmètre : {self.scope_label()}'
+            scope.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            scope.runs[0].font.size = Pt(12)
+            scope.runs[0].font.name = 'Arial'
+            scope.runs[0].font.color.rgb = RGBColor(52, 73, 94)
+        
         self.doc.add_paragraph('\n\n\n\n')
         
         # Date de génération
@@ -259,16 +605,13 @@ class DetailedCocoaReportGenerator:
         # Transformation
         self.doc.add_heading('Capacités de Transformation', level=3)
         
-        companies = [c for c in self.broyage_data if c['societe'] not in ['TOTAL', 'Estimation de la récolte annuelle de cacao']]
-        total_installed = sum(c['capacite_installee'] for c in companies)
-        total_2027 = sum(c['previsions_2027_28'] for c in companies)
-        total_2030 = sum(c['previsions_2029_30'] for c in companies)
+        stats = self.statistics
         
         transform_points = [
-            f"Capacité installée actuelle : {total_installed:,.0f} tonnes/an réparties sur {len(companies)} sociétés",
-            f"Objectif 2027-28 : {total_2027:,.0f} tonnes/an (+{((total_2027-total_installed)/total_installed*100):.1f}%)",
-            f"Vision 2029-30 : {total_2030:,.0f} tonnes/an (+{((total_2030-total_installed)/total_installed*100):.1f}%)",
-            "Taux d'utilisation actuel de 74% nécessitant une optimisation"
+            f"Capacité installée actuelle : {stats.total_installed:,.0f} tonnes/an réparties sur {stats.company_count} sociétés",
+            f"Objectif 2027-28 : {stats.total_2027:,.0f} tonnes/an (+{stats.growth_2027:.1f}%)",
+            f"Vision 2029-30 : {stats.total_2030:,.0f} tonnes/an (+{stats.growth_2030:.1f}%)",
+            f"Taux d'utilisation actuel de {stats.utilization_rate:.1f}% nécessitant une optimisation"
         ]
         for point in transform_points:
             p = self.doc.add_paragraph(style='List Bullet')
@@ -277,11 +620,9 @@ class DetailedCocoaReportGenerator:
         # Exportations
         self.doc.add_heading('Flux d\'Exportation', level=3)
         export_points = [
-            f"Volume total exporté : {self.export_data['metadata']['total_weight']/1000000:.1f} millions de tonnes",
-            f"Nombre de transactions : {self.export_data['metadata']['total_records']:,}",
-            "55 pays de destination avec une forte concentration européenne (56.5%)",
-            "Pays-Bas premier importateur avec 30.3% des volumes"
-        ]
+            f"Volume total exporté : {stats.export_weight/1000000:.1f} millions de tonnes",
+            f"Nombre de transactions : {stats.export_records:,}",
+        ] + self.destination_points()
         for point in export_points:
             p = self.doc.add_paragraph(style='List Bullet')
             p.add_run(point)
@@ -302,6 +643,43 @@ class DetailedCocoaReportGenerator:
             
         self.doc.add_page_break()
         
+    def destination_points(self):
+        """Points du résumé sur les destinations, omis lorsque le périmètre n'a pas d'exportations"""
+        stats = self.statistics
+        if not stats.destination_count:
+            return ["Aucune exportation enregistrée dans le périmètre analysé"]
+        
+        regions = stats.region_shares
+        europe_share = sum(regions.get(region, 0) for region in EUROPE)
+        eu_share = regions.get('Union européenne', 0)
+        if europe_share >= EUROPE_CONCENTRATION_SHARE:
+            points = [f"{stats.destination_count} pays de destination avec une forte concentration européenne "
+                      f"({europe_share:.1f}%, dont {eu_share:.1f}% vers l'Union européenne)"]
+        else:
+            points = [f"{stats.destination_count} pays de destination, dont {europe_share:.1f}% des volumes "
+                      f"vers l'Europe ({eu_share:.1f}% vers l'Union européenne)"]
+        
+        leader, leader_share = stats.leading_country
+        if leader is not None:
+            points.append(f"{leader} premier importateur avec {leader_share:.1f}% des volumes")
+        named_regions = [f"{region} {share:.1f}%" for region, share in regions.items() if region != 'Autres']
+        if named_regions:
+            points.append("Répartition régionale : " + ', '.join(named_regions))
+        return points
+        
+    def market_heading(self, number, country, label=None):
+        """Titre d'une analyse de pays, avec son rang et sa part calculés sur les exportations"""
+        stats = self.statistics
+        rank = stats.country_rank(country)
+        if rank is None:
+            details = ['absent du périmètre']
+        else:
+            details = ['premier marché' if rank == 1 else f'{rank}e marché',
+                       f"{stats.country_share(country):.1f}% des exportations"]
+        if label is None:
+            label = details.pop(0).capitalize()
+        return f"{number} {country} - {label}" + (f" ({', '.join(details)})" if details else '')
+        
     def section_1_detailed_zes(self):
         """Section 1 détaillée : Les Zones Économiques Spéciales"""
         self.doc.add_heading('1. LES ZONES ÉCONOMIQUES SPÉCIALES', level=1)
@@ -377,9 +755,6 @@ class DetailedCocoaReportGenerator:
         overview_intro.alignment = WD_PARAGRAPH_ALIGNMENT.JUSTIFY
         
         # Tableau des indicateurs clés
-        indicators_table = self.doc.add_table(rows=5, cols=2)
-        indicators_table.style = 'Light Shading Accent 1'
-        
         indicators = [
             ('Indicateur', 'Valeur'),
             ('Unités de transformation attendues', '+150'),
@@ -387,16 +762,7 @@ class DetailedCocoaReportGenerator:
             ('ZES principales actives', '4'),
             ('Période de déploiement', '2024-2027')
         ]
-        
-        for i, (label, value) in enumerate(indicators):
-            cells = indicators_table.rows[i].cells
-            cells[0].text = label
-            cells[1].text = value
-            if i == 0:
-                for cell in cells:
-                    for paragraph in cell.paragraphs:
-                        for run in paragraph.runs:
-                            run.font.bold = True
+        add_table(self.doc, indicators, style='Light Shading Accent 1')
                             
         # Secteurs prioritaires
         self.doc.add_heading('Secteurs prioritaires dans les ZES', level=3)
@@ -471,9 +837,6 @@ class DetailedCocoaReportGenerator:
             p.alignment = WD_PARAGRAPH_ALIGNMENT.JUSTIFY
             
         # Tableau des caractéristiques PK24
-        pk24_table = self.doc.add_table(rows=7, cols=2)
-        pk24_table.style = 'Light Grid Accent 1'
-        
         pk24_data = [
             ('Caractéristique', 'Description'),
             ('Superficie', '444 hectares pour la ZEI, 1 000 hectares pour le projet global PK24'),
@@ -483,16 +846,7 @@ class DetailedCocoaReportGenerator:
             ('Emplois prévus', '25 000 emplois directs et 50 000 emplois indirects'),
             ('Statut 2024', 'En développement actif, première phase opérationnelle fin 2024')
         ]
-        
-        for i, (label, value) in enumerate(pk24_data):
-            cells = pk24_table.rows[i].cells
-            cells[0].text = label
-            cells[1].text = value
-            if i == 0:
-                for cell in cells:
-                    for paragraph in cell.paragraphs:
-                        for run in paragraph.runs:
-                            run.font.bold = True
+        add_table(self.doc, pk24_data, style='Light Grid Accent 1')
                             
         pk24_analysis = [
             "\nL'approche de développement de PK24 repose sur un modèle de partenariat public-privé "
@@ -712,63 +1066,24 @@ class DetailedCocoaReportGenerator:
         self.doc.add_heading('2.3 Analyse de la capacité installée actuelle', level=2)
         
         # Calculs
-        companies = [c for c in self.broyage_data if c['societe'] not in ['TOTAL', 'Estimation de la récolte annuelle de cacao']]
-        total_installed = sum(c['capacite_installee'] for c in companies)
-        total_used = sum(c['capacite_utilisee'] for c in companies)
-        utilization_rate = (total_used / total_installed * 100) if total_installed > 0 else 0
+        stats = self.statistics
         
         capacity_intro = self.doc.add_paragraph()
         capacity_intro.add_run(
-            f"L'industrie de transformation du cacao en Côte d'Ivoire compte actuellement {len(companies)} "
-            f"sociétés actives, représentant une capacité installée totale de {total_installed:,.0f} tonnes "
+            f"L'industrie de transformation du cacao en Côte d'Ivoire compte actuellement {stats.company_count} "
+            f"sociétés actives, représentant une capacité installée totale de {stats.total_installed:,.0f} tonnes "
             f"par an. Cette capacité place le pays au premier rang africain et parmi les principaux centres "
             f"de transformation mondiaux."
         )
         capacity_intro.alignment = WD_PARAGRAPH_ALIGNMENT.JUSTIFY
         
         # Graphique des top 10 sociétés
-        plt.figure(figsize=(12, 8))
-        top_companies = sorted(companies, key=lambda x: x['capacite_installee'], reverse=True)[:10]
-        
-        company_names = [c['societe'] for c in top_companies]
-        capacities = [c['capacite_installee']/1000 for c in top_companies]
-        used_capacities = [c['capacite_utilisee']/1000 for c in top_companies]
-        
-        x = np.arange(len(company_names))
-        width = 0.35
-        
-        fig, ax = plt.subplots(figsize=(12, 8))
-        bars1 = ax.bar(x - width/2, capacities, width, label='Capacité installée', color=COLORS[0])
-        bars2 = ax.bar(x + width/2, used_capacities, width, label='Capacité utilisée', color=COLORS[2])
-        
-        ax.set_xlabel('Sociétés', fontsize=12, fontweight='bold')
-        ax.set_ylabel('Capacité (milliers de tonnes/an)', fontsize=12, fontweight='bold')
-        ax.set_title('Top 10 des sociétés de transformation par capacité', fontsize=14, fontweight='bold')
-        ax.set_xticks(x)
-        ax.set_xticklabels(company_names, rotation=45, ha='right')
-        ax.legend()
-        ax.grid(True, alpha=0.3)
-        
-        # Ajouter les valeurs sur les barres
-        for bars in [bars1, bars2]:
-            for bar in bars:
-                height = bar.get_height()
-                ax.annotate(f'{height:.0f}',
-                           xy=(bar.get_x() + bar.get_width() / 2, height),
-                           xytext=(0, 3),
-                           textcoords="offset points",
-                           ha='center', va='bottom',
-                           fontsize=9)
-        
-        plt.tight_layout()
-        plt.savefig('capacity_comparison.png', dpi=300, bbox_inches='tight')
-        self.doc.add_picture('capacity_comparison.png', width=Inches(6.5))
-        plt.close()
+        self.add_chart('capacity_comparison', width=Inches(6.5))
         
         # Analyse détaillée
         capacity_analysis = [
-            f"\nLe taux d'utilisation moyen de {utilization_rate:.1f}% révèle un potentiel de croissance "
-            f"significatif sans investissements majeurs supplémentaires. Les {total_installed-total_used:,.0f} "
+            f"\nLe taux d'utilisation moyen de {stats.utilization_rate:.1f}% révèle un potentiel de croissance "
+            f"significatif sans investissements majeurs supplémentaires. Les {stats.unused_capacity:,.0f} "
             f"tonnes de capacité inutilisée représentent une opportunité immédiate d'augmentation de la "
             f"production de produits semi-finis.",
             
@@ -802,59 +1117,45 @@ class DetailedCocoaReportGenerator:
         # Tableau détaillé des capacités
         self.doc.add_heading('Tableau récapitulatif des capacités par société', level=3)
         
-        # Créer le tableau
-        table = self.doc.add_table(rows=len(companies)+2, cols=6)
-        table.style = 'Light Shading Accent 1'
-        
         # En-têtes
-        headers = ['Société', 'Capacité\nInstallée', 'Capacité\nUtilisée', 'Taux\nUtilisation', 
-                  'Projets\n2027-28', 'Projets\n2029-30']
-        for i, header in enumerate(headers):
-            cell = table.rows[0].cells[i]
-            cell.text = header
-            for paragraph in cell.paragraphs:
-                for run in paragraph.runs:
-                    run.font.bold = True
-                    run.font.size = Pt(10)
+        rows = [['Société', 'Capacité\nInstallée', 'Capacité\nUtilisée', 'Taux\nUtilisation',
+                 'Projets\n2027-28', 'Projets\n2029-30']]
                     
         # Données
-        for i, company in enumerate(companies, 1):
-            cells = table.rows[i].cells
-            cells[0].text = company['societe']
-            cells[1].text = f"{company['capacite_installee']:,.0f}"
-            cells[2].text = f"{company['capacite_utilisee']:,.0f}"
-            util_rate = (company['capacite_utilisee'] / company['capacite_installee'] * 100) if company['capacite_installee'] > 0 else 0
-            cells[3].text = f"{util_rate:.1f}%"
-            cells[4].text = f"{company['previsions_2027_28']:,.0f}"
-            cells[5].text = f"{company['previsions_2029_30']:,.0f}"
+        for company in stats.companies:
+            installed = capacity(company, 'capacite_installee')
+            used = capacity(company, 'capacite_utilisee')
+            rows.append([
+                company['societe'],
+                f"{installed:,.0f}",
+                f"{used:,.0f}",
+                f"{utilization_rate(installed, used):.1f}%",
+                f"{capacity(company, 'previsions_2027_28'):,.0f}",
+                f"{capacity(company, 'previsions_2029_30'):,.0f}",
+            ])
             
         # Ligne de total
-        total_row = table.rows[len(companies)+1].cells
-        total_row[0].text = 'TOTAL'
-        total_row[1].text = f"{total_installed:,.0f}"
-        total_row[2].text = f"{total_used:,.0f}"
-        total_row[3].text = f"{utilization_rate:.1f}%"
-        total_row[4].text = f"{sum(c['previsions_2027_28'] for c in companies):,.0f}"
-        total_row[5].text = f"{sum(c['previsions_2029_30'] for c in companies):,.0f}"
-        
-        for cell in total_row:
-            for paragraph in cell.paragraphs:
-                for run in paragraph.runs:
-                    run.font.bold = True
+        rows.append([
+            'TOTAL',
+            f"{stats.total_installed:,.0f}",
+            f"{stats.total_used:,.0f}",
+            f"{stats.utilization_rate:.1f}%",
+            f"{stats.total_2027:,.0f}",
+            f"{stats.total_2030:,.0f}",
+        ])
+        
+        add_table(self.doc, rows, style='Light Shading Accent 1', bold_rows=(0, len(rows) - 1),
+                  header_size=Pt(10))
                     
         self.doc.add_page_break()
         
         # 2.4 Projections 2027
         self.doc.add_heading('2.4 Projections de croissance 2027', level=2)
         
-        total_2027 = sum(c['previsions_2027_28'] for c in companies)
-        new_projects = sum(c['projets_confirmer'] for c in companies)
-        growth_2027 = ((total_2027 - total_installed) / total_installed * 100)
-        
         projections_2027 = [
-            f"Les projections pour l'horizon 2027-28 prévoient une capacité totale de {total_2027:,.0f} "
-            f"tonnes par an, représentant une croissance de {growth_2027:.1f}% par rapport à la capacité "
-            f"actuelle. Cette expansion ambitieuse repose sur {new_projects:,.0f} tonnes de nouveaux "
+            f"Les projections pour l'horizon 2027-28 prévoient une capacité totale de {stats.total_2027:,.0f} "
+            f"tonnes par an, représentant une croissance de {stats.growth_2027:.1f}% par rapport à la capacité "
+            f"actuelle. Cette expansion ambitieuse repose sur {stats.new_projects:,.0f} tonnes de nouveaux "
             f"projets confirmés.",
             
             "Les principaux moteurs de cette croissance incluent :",
@@ -878,41 +1179,14 @@ class DetailedCocoaReportGenerator:
             p.add_run(driver)
             
         # Graphique d'évolution
-        plt.figure(figsize=(10, 6))
-        years = ['2024', '2027-28', '2029-30']
-        capacities = [total_installed/1000, total_2027/1000, sum(c['previsions_2029_30'] for c in companies)/1000]
-        
-        plt.plot(years, capacities, marker='o', linewidth=3, markersize=10, color=COLORS[0])
-        plt.fill_between(range(len(years)), capacities, alpha=0.3, color=COLORS[0])
-        
-        for i, (year, cap) in enumerate(zip(years, capacities)):
-            plt.annotate(f'{cap:.0f}k t/an', 
-                        xy=(i, cap), 
-                        xytext=(0, 20),
-                        textcoords='offset points',
-                        ha='center',
-                        fontsize=12,
-                        fontweight='bold')
-        
-        plt.xlabel('Période', fontsize=12, fontweight='bold')
-        plt.ylabel('Capacité (milliers de tonnes/an)', fontsize=12, fontweight='bold')
-        plt.title('Évolution prévue des capacités de transformation', fontsize=14, fontweight='bold')
-        plt.grid(True, alpha=0.3)
-        plt.tight_layout()
-        
-        plt.savefig('capacity_evolution.png', dpi=300, bbox_inches='tight')
-        self.doc.add_picture('capacity_evolution.png', width=Inches(6))
-        plt.close()
+        self.add_chart('capacity_evolution', width=Inches(6))
         
         # 2.5 Objectifs 2030
         self.doc.add_heading('2.5 Objectifs à l\'horizon 2030', level=2)
         
-        total_2030 = sum(c['previsions_2029_30'] for c in companies)
-        growth_2030 = ((total_2030 - total_installed) / total_installed * 100)
-        
         objectives_2030 = [
             f"L'horizon 2029-30 marque une étape cruciale avec un objectif de capacité totale de "
-            f"{total_2030:,.0f} tonnes par an, soit une multiplication par {total_2030/total_installed:.1f} "
+            f"{stats.total_2030:,.0f} tonnes par an, soit une multiplication par {stats.multiplier_2030:.1f} "
             f"de la capacité actuelle. Cette ambition s'aligne sur l'objectif gouvernemental de transformer "
             f"au moins 50% de la production nationale de cacao.",
             
@@ -948,7 +1222,7 @@ class DetailedCocoaReportGenerator:
         challenges = [
             {
                 'title': 'Amélioration du taux d\'utilisation',
-                'desc': 'Le taux d\'utilisation actuel de 74% indique une sous-utilisation significative '
+                'desc': f'Le taux d\'utilisation actuel de {self.statistics.utilization_rate:.1f}% indique une sous-utilisation significative '
                        'des capacités existantes. Les causes incluent les difficultés d\'approvisionnement '
                        'en fèves de qualité constante, les contraintes de trésorerie pour le préfinancement '
                        'des achats, et les interruptions techniques pour maintenance. L\'amélioration de ce '
@@ -1006,32 +1280,18 @@ class DetailedCocoaReportGenerator:
         """Section 3 détaillée : Analyse des destinations avec une page par analyse"""
         self.doc.add_heading('3. ANALYSE DES DESTINATIONS 2024-2025', level=1)
         
-        # Préparer les données
-        records = self.export_data['records']
-        df = pd.DataFrame(records)
-        
-        # Mapping des codes pays
-        country_mapping = {
-            'NL': 'Pays-Bas', 'FR': 'France', 'US': 'États-Unis', 'ES': 'Espagne',
-            'BE': 'Belgique', 'DE': 'Allemagne', 'MY': 'Malaisie', 'GB': 'Royaume-Uni',
-            'CA': 'Canada', 'EE': 'Estonie', 'IT': 'Italie', 'ZA': 'Afrique du Sud',
-            'TR': 'Turquie', 'PL': 'Pologne', 'BR': 'Brésil', 'PT': 'Portugal',
-            'ID': 'Indonésie', 'AU': 'Australie', 'CN': 'Chine', 'MX': 'Mexique',
-            'IL': 'Israël', 'BG': 'Bulgarie', 'MA': 'Maroc', 'JP': 'Japon',
-            'EG': 'Égypte', 'QA': 'Qatar', 'LT': 'Lituanie', 'CM': 'Cameroun',
-            'UY': 'Uruguay', 'SN': 'Sénégal', 'RU': 'Russie', 'HR': 'Croatie'
-        }
-        
-        df['country_name'] = df['destination'].map(country_mapping).fillna('Autres')
+        # Agrégats de toutes les dimensions, calculés en une seule passe
+        cube = self.get_aggregates()['cube']
+        stats = self.statistics
         
         # 3.1 Vue d'ensemble
         self.doc.add_heading('3.1 Vue d\'ensemble des exportations', level=2)
         
         overview_text = f"""
         Sur la période octobre 2024 - juillet 2025, la Côte d'Ivoire a exporté un total de 
-        {self.export_data['metadata']['total_weight']/1000000:.2f} millions de tonnes de produits 
-        cacaoyers, représentant une valeur totale de {self.export_data['metadata']['total_value']/1000000000:.2f} 
-        milliards de FCFA. Ces exportations se sont réparties sur {self.export_data['metadata']['total_records']:,} 
+        {stats.export_weight/1000000:.2f} millions de tonnes de produits 
+        cacaoyers, représentant une valeur totale de {stats.export_value/1000000000:.2f} 
+        milliards de FCFA. Ces exportations se sont réparties sur {stats.export_records:,} 
         transactions individuelles, témoignant de l'intensité des échanges commerciaux.
         
         L'analyse détaillée qui suit examine les flux d'exportation sous six angles complémentaires : 
@@ -1045,26 +1305,14 @@ class DetailedCocoaReportGenerator:
         p.alignment = WD_PARAGRAPH_ALIGNMENT.JUSTIFY
         
         # Indicateurs clés
-        key_metrics = self.doc.add_table(rows=5, cols=2)
-        key_metrics.style = 'Light Shading Accent 1'
-        
         metrics = [
             ('Indicateur', 'Valeur'),
-            ('Volume total exporté', f"{self.export_data['metadata']['total_weight']/1000000:.2f} millions de tonnes"),
-            ('Valeur totale', f"{self.export_data['metadata']['total_value']/1000000000:.2f} milliards FCFA"),
-            ('Nombre de transactions', f"{self.export_data['metadata']['total_records']:,}"),
-            ('Nombre de pays destinations', f"{df['country_name'].nunique()}")
+            ('Volume total exporté', f"{stats.export_weight/1000000:.2f} millions de tonnes"),
+            ('Valeur totale', f"{stats.export_value/1000000000:.2f} milliards FCFA"),
+            ('Nombre de transactions', f"{stats.export_records:,}"),
+            ('Nombre de pays destinations', f"{stats.destination_count}")
         ]
-        
-        for i, (label, value) in enumerate(metrics):
-            cells = key_metrics.rows[i].cells
-            cells[0].text = label
-            cells[1].text = value
-            if i == 0:
-                for cell in cells:
-                    for paragraph in cell.paragraphs:
-                        for run in paragraph.runs:
-                            run.font.bold = True
+        add_table(self.doc, metrics, style='Light Shading Accent 1')
                             
         self.doc.add_page_break()
         
@@ -1072,59 +1320,20 @@ class DetailedCocoaReportGenerator:
         self.doc.add_heading('3.2 Analyse par pays destination', level=2)
         
         # Calculer les statistiques par pays
-        country_stats = df.groupby('country_name').agg({
-            'poids_net': 'sum',
-            'id': 'count'
-        }).sort_values('poids_net', ascending=False).head(10)
+        country_stats = cube.rollup('country_name', top=10)
         
         # Tableau des top 10 pays
-        country_table = self.doc.add_table(rows=11, cols=5)
-        country_table.style = 'Light Shading Accent 1'
-        
-        # En-têtes
-        headers = ['Rang', 'Pays', 'Volume (tonnes)', 'Part (%)', 'Nb Transactions']
-        for i, header in enumerate(headers):
-            cell = country_table.rows[0].cells[i]
-            cell.text = header
-            for paragraph in cell.paragraphs:
-                for run in paragraph.runs:
-                    run.font.bold = True
-                    
-        # Données
-        total_weight = df['poids_net'].sum()
-        for i, (country, row) in enumerate(country_stats.iterrows(), 1):
-            cells = country_table.rows[i].cells
-            cells[0].text = str(i)
-            cells[1].text = country
-            cells[2].text = f"{row['poids_net']/1000:,.0f}"
-            cells[3].text = f"{row['poids_net']/total_weight*100:.1f}%"
-            cells[4].text = f"{row['id']:,}"
+        total_weight = cube.total('poids_net')
+        self.add_ranking_table(country_stats, 'Pays', total_weight)
             
         # Graphique camembert
-        plt.figure(figsize=(10, 8))
-        top_countries = country_stats.head(8)
-        other_weight = country_stats.iloc[8:]['poids_net'].sum()
-        
-        weights = list(top_countries['poids_net'].values) + [other_weight]
-        labels = list(top_countries.index) + ['Autres']
-        
-        colors = COLORS[:len(labels)]
-        explode = [0.05] + [0] * (len(labels) - 1)  # Explode first slice
-        
-        plt.pie(weights, labels=labels, autopct='%1.1f%%', colors=colors, explode=explode,
-                shadow=True, startangle=90)
-        plt.title('Répartition des exportations par pays destination', fontsize=16, fontweight='bold', pad=20)
-        plt.tight_layout()
-        
-        plt.savefig('destinations_pie.png', dpi=300, bbox_inches='tight', facecolor='white')
-        self.doc.add_picture('destinations_pie.png', width=Inches(6))
-        plt.close()
+        self.add_chart('destinations_pie', width=Inches(6))
         
         # Analyse textuelle
         analysis = f"""
         L'analyse des destinations révèle une forte concentration des exportations vers l'Europe, 
         qui absorbe {(country_stats.loc[country_stats.index.isin(['Pays-Bas', 'France', 'Belgique', 'Allemagne', 'Espagne'])]['poids_net'].sum()/total_weight*100):.1f}% 
-        des volumes totaux. Les Pays-Bas dominent largement avec {(country_stats.loc['Pays-Bas']['poids_net']/total_weight*100):.1f}% 
+        des volumes totaux. Les Pays-Bas dominent largement avec {(country_stats['poids_net'].get('Pays-Bas', 0)/total_weight*100):.1f}% 
         des exportations, confirmant le rôle d'Amsterdam comme hub mondial du commerce du cacao.
         
         Cette concentration présente à la fois des avantages (relations commerciales établies, 
@@ -1143,51 +1352,13 @@ class DetailedCocoaReportGenerator:
         self.doc.add_heading('3.3 Analyse par type de produit', level=2)
         
         # Stats par produit
-        product_stats = df.groupby('produit_simple').agg({
-            'poids_net': 'sum',
-            'id': 'count'
-        }).sort_values('poids_net', ascending=False).head(5)
+        product_stats = cube.rollup('produit_simple', top=5)
         
         # Tableau
-        product_table = self.doc.add_table(rows=6, cols=5)
-        product_table.style = 'Light Shading Accent 1'
-        
-        headers = ['Rang', 'Produit', 'Volume (tonnes)', 'Part (%)', 'Nb Transactions']
-        for i, header in enumerate(headers):
-            cell = product_table.rows[0].cells[i]
-            cell.text = header
-            for paragraph in cell.paragraphs:
-                for run in paragraph.runs:
-                    run.font.bold = True
-                    
-        for i, (product, row) in enumerate(product_stats.iterrows(), 1):
-            cells = product_table.rows[i].cells
-            cells[0].text = str(i)
-            cells[1].text = product
-            cells[2].text = f"{row['poids_net']/1000:,.0f}"
-            cells[3].text = f"{row['poids_net']/total_weight*100:.1f}%"
-            cells[4].text = f"{row['id']:,}"
+        self.add_ranking_table(product_stats, 'Produit', total_weight)
             
         # Graphique en barres horizontales
-        plt.figure(figsize=(10, 6))
-        products = product_stats.index[::-1]
-        volumes = product_stats['poids_net'][::-1] / 1000
-        
-        bars = plt.barh(products, volumes, color=COLORS[0])
-        
-        # Ajouter les valeurs sur les barres
-        for i, (product, volume) in enumerate(zip(products, volumes)):
-            plt.text(volume + max(volumes)*0.01, i, f'{volume:,.0f}k t', 
-                    va='center', fontsize=10, fontweight='bold')
-        
-        plt.xlabel('Volume (milliers de tonnes)', fontsize=12, fontweight='bold')
-        plt.title('Répartition des exportations par type de produit', fontsize=14, fontweight='bold')
-        plt.grid(True, axis='x', alpha=0.3)
-        plt.tight_layout()
-        
-        plt.savefig('products_bar.png', dpi=300, bbox_inches='tight', facecolor='white')
-        self.doc.add_picture('products_bar.png', width=Inches(6))
-        plt.close()
+        self.add_chart('products_bar', width=Inches(6))
         
         # Analyse
         analysis = """
@@ -1211,74 +1382,24 @@ class DetailedCocoaReportGenerator:
         self.doc.add_heading('3.4 Analyse par port d\'exportation', level=2)
         
         # Stats par port
-        port_stats = df.groupby('port').agg({
-            'poids_net': 'sum',
-            'id': 'count'
-        }).sort_values('poids_net', ascending=False)
+        port_stats = cube.rollup('port')
         
         # Tableau
-        port_table = self.doc.add_table(rows=3, cols=5)
-        port_table.style = 'Light Shading Accent 1'
-        
-        headers = ['Port', 'Volume (tonnes)', 'Part (%)', 'Nb Transactions', 'Volume moyen/transaction']
-        for i, header in enumerate(headers):
-            cell = port_table.rows[0].cells[i]
-            cell.text = header
-            for paragraph in cell.paragraphs:
-                for run in paragraph.runs:
-                    run.font.bold = True
-                    
-        for i, (port, row) in enumerate(port_stats.iterrows(), 1):
-            cells = port_table.rows[i].cells
-            cells[0].text = port
-            cells[1].text = f"{row['poids_net']/1000:,.0f}"
-            cells[2].text = f"{row['poids_net']/total_weight*100:.1f}%"
-            cells[3].text = f"{row['id']:,}"
-            cells[4].text = f"{row['poids_net']/row['id']:.0f} t"
+        add_frame_table(self.doc, port_stats, [
+            ('Port', INDEX, '{}'),
+            ('Volume (tonnes)', lambda stats: stats['poids_net'] / 1000, '{:,.0f}'),
+            ('Part (%)', lambda stats: stats['poids_net'] / total_weight * 100, '{:.1f}%'),
+            ('Nb Transactions', 'id', '{:,}'),
+            ('Volume moyen/transaction', lambda stats: stats['poids_net'] / stats['id'], '{:.0f} t'),
+        ], style='Light Shading Accent 1')
             
-        # Graphique comparatif
-        plt.figure(figsize=(10, 6))
-        
         # Diagramme en anneau
-        sizes = port_stats['poids_net'].values
-        labels = port_stats.index
-        colors = [COLORS[0], COLORS[2]]
-        
-        # Create circle
-        fig, ax = plt.subplots(figsize=(10, 8))
-        wedges, texts, autotexts = ax.pie(sizes, labels=labels, autopct='%1.1f%%', 
-                                          colors=colors, startangle=90,
-                                          wedgeprops=dict(width=0.5))
-        
-        # Add title
-        plt.title('Répartition du volume d\'exportation par port', fontsize=16, fontweight='bold', pad=20)
-        
-        # Beautify
-        for text in texts:
-            text.set_fontsize(12)
-            text.set_fontweight('bold')
-        for autotext in autotexts:
-            autotext.set_color('white')
-            autotext.set_fontsize(14)
-            autotext.set_fontweight('bold')
-            
-        # Add center text
-        centre_circle = plt.Circle((0,0), 0.70, fc='white')
-        fig.gca().add_artist(centre_circle)
-        
-        # Add center text
-        plt.text(0, 0, f'{total_weight/1000000:.1f}M\ntonnes', 
-                ha='center', va='center', fontsize=16, fontweight='bold')
-        
-        plt.tight_layout()
-        plt.savefig('ports_donut.png', dpi=300, bbox_inches='tight', facecolor='white')
-        self.doc.add_picture('ports_donut.png', width=Inches(5.5))
-        plt.close()
+        self.add_chart('ports_donut', width=Inches(5.5))
         
         # Analyse
         analysis = f"""
         La répartition entre les deux principaux ports du pays révèle l'importance stratégique de 
-        San Pedro pour les exportations de cacao. Avec {(port_stats.loc['SAN PEDRO']['poids_net']/total_weight*100):.1f}% 
+        San Pedro pour les exportations de cacao. Avec {(port_stats['poids_net'].get('SAN PEDRO', 0)/total_weight*100):.1f}% 
         des volumes, San Pedro confirme son statut de premier port cacaoyer au monde.
         
         Cette spécialisation portuaire présente des avantages en termes d'économies d'échelle et 
@@ -1298,58 +1419,18 @@ class DetailedCocoaReportGenerator:
         self.doc.add_heading('3.5 Analyse par type d\'emballage', level=2)
         
         # Stats par emballage
-        packaging_stats = df.groupby('emballage_simple').agg({
-            'poids_net': 'sum',
-            'id': 'count'
-        }).sort_values('poids_net', ascending=False).head(5)
+        packaging_stats = cube.rollup('emballage_simple', top=5)
         
         # Tableau
-        packaging_table = self.doc.add_table(rows=6, cols=4)
-        packaging_table.style = 'Light Shading Accent 1'
-        
-        headers = ['Type d\'emballage', 'Volume (tonnes)', 'Part (%)', 'Nb Transactions']
-        for i, header in enumerate(headers):
-            cell = packaging_table.rows[0].cells[i]
-            cell.text = header
-            for paragraph in cell.paragraphs:
-                for run in paragraph.runs:
-                    run.font.bold = True
-                    
-        for i, (packaging, row) in enumerate(packaging_stats.iterrows(), 1):
-            cells = packaging_table.rows[i].cells
-            cells[0].text = packaging
-            cells[1].text = f"{row['poids_net']/1000:,.0f}"
-            cells[2].text = f"{row['poids_net']/total_weight*100:.1f}%"
-            cells[3].text = f"{row['id']:,}"
+        add_frame_table(self.doc, packaging_stats, [
+            ('Type d\'emballage', INDEX, '{}'),
+            ('Volume (tonnes)', lambda stats: stats['poids_net'] / 1000, '{:,.0f}'),
+            ('Part (%)', lambda stats: stats['poids_net'] / total_weight * 100, '{:.1f}%'),
+            ('Nb Transactions', 'id', '{:,}'),
+        ], style='Light Shading Accent 1')
             
         # Graphique
-        plt.figure(figsize=(10, 6))
-        
-        # Stacked bar chart for packaging types
-        packaging_data = packaging_stats.head(4)
-        
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        # Create bars
-        bars = ax.bar(packaging_data.index, packaging_data['poids_net']/1000, 
-                      color=[COLORS[i % len(COLORS)] for i in range(len(packaging_data))])
-        
-        # Add value labels on bars
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'{height:,.0f}k t',
-                   ha='center', va='bottom', fontweight='bold')
-        
-        ax.set_ylabel('Volume (milliers de tonnes)', fontsize=12, fontweight='bold')
-        ax.set_title('Types d\'emballage utilisés pour l\'exportation', fontsize=14, fontweight='bold')
-        ax.set_xticklabels(packaging_data.index, rotation=45, ha='right')
-        plt.grid(True, axis='y', alpha=0.3)
-        plt.tight_layout()
-        
-        plt.savefig('packaging_bar.png', dpi=300, bbox_inches='tight', facecolor='white')
-        self.doc.add_picture('packaging_bar.png', width=Inches(6))
-        plt.close()
+        self.add_chart('packaging_bar', width=Inches(6))
         
         # Analyse
         analysis = """
@@ -1374,53 +1455,13 @@ class DetailedCocoaReportGenerator:
         self.doc.add_heading('3.6 Analyse par déclarant', level=2)
         
         # Stats par déclarant
-        declarant_stats = df.groupby('declarant_simple').agg({
-            'poids_net': 'sum',
-            'id': 'count'
-        }).sort_values('poids_net', ascending=False).head(10)
+        declarant_stats = cube.rollup('declarant_simple', top=10)
         
         # Tableau
-        declarant_table = self.doc.add_table(rows=11, cols=5)
-        declarant_table.style = 'Light Shading Accent 1'
-        
-        headers = ['Rang', 'Déclarant', 'Volume (tonnes)', 'Part (%)', 'Nb Transactions']
-        for i, header in enumerate(headers):
-            cell = declarant_table.rows[0].cells[i]
-            cell.text = header
-            for paragraph in cell.paragraphs:
-                for run in paragraph.runs:
-                    run.font.bold = True
-                    
-        for i, (declarant, row) in enumerate(declarant_stats.iterrows(), 1):
-            cells = declarant_table.rows[i].cells
-            cells[0].text = str(i)
-            cells[1].text = declarant
-            cells[2].text = f"{row['poids_net']/1000:,.0f}"
-            cells[3].text = f"{row['poids_net']/total_weight*100:.1f}%"
-            cells[4].text = f"{row['id']:,}"
+        self.add_ranking_table(declarant_stats, 'Déclarant', total_weight)
             
         # Graphique Top 10
-        plt.figure(figsize=(10, 8))
-        
-        top_declarants = declarant_stats.head(10)
-        y_pos = np.arange(len(top_declarants))
-        
-        plt.barh(y_pos, top_declarants['poids_net']/1000, color=COLORS[1])
-        plt.yticks(y_pos, top_declarants.index)
-        plt.xlabel('Volume (milliers de tonnes)', fontsize=12, fontweight='bold')
-        plt.title('Top 10 des déclarants en douane', fontsize=14, fontweight='bold')
-        plt.gca().invert_yaxis()
-        
-        # Add value labels
-        for i, v in enumerate(top_declarants['poids_net']/1000):
-            plt.text(v + 1, i, f'{v:,.0f}k t', va='center', fontweight='bold')
-            
-        plt.grid(True, axis='x', alpha=0.3)
-        plt.tight_layout()
-        
-        plt.savefig('declarants_bar.png', dpi=300, bbox_inches='tight', facecolor='white')
-        self.doc.add_picture('declarants_bar.png', width=Inches(6))
-        plt.close()
+        self.add_chart('declarants_bar', width=Inches(6))
         
         # Analyse
         analysis = f"""
@@ -1446,62 +1487,13 @@ class DetailedCocoaReportGenerator:
         self.doc.add_heading('3.7 Analyse par exportateur', level=2)
         
         # Stats par exportateur
-        exporter_stats = df.groupby('exportateur_simple').agg({
-            'poids_net': 'sum',
-            'id': 'count'
-        }).sort_values('poids_net', ascending=False).head(10)
+        exporter_stats = cube.rollup('exportateur_simple', top=10)
         
         # Tableau
-        exporter_table = self.doc.add_table(rows=11, cols=5)
-        exporter_table.style = 'Light Shading Accent 1'
-        
-        headers = ['Rang', 'Exportateur', 'Volume (tonnes)', 'Part (%)', 'Nb Transactions']
-        for i, header in enumerate(headers):
-            cell = exporter_table.rows[0].cells[i]
-            cell.text = header
-            for paragraph in cell.paragraphs:
-                for run in paragraph.runs:
-                    run.font.bold = True
-                    
-        for i, (exporter, row) in enumerate(exporter_stats.iterrows(), 1):
-            cells = exporter_table.rows[i].cells
-            cells[0].text = str(i)
-            cells[1].text = exporter
-            cells[2].text = f"{row['poids_net']/1000:,.0f}"
-            cells[3].text = f"{row['poids_net']/total_weight*100:.1f}%"
-            cells[4].text = f"{row['id']:,}"
+        self.add_ranking_table(exporter_stats, 'Exportateur', total_weight)
             
         # Graphique circulaire avec les top exportateurs
-        plt.figure(figsize=(10, 8))
-        
-        # Prepare data for pie chart
-        top_5_exporters = exporter_stats.head(5)
-        other_volume = exporter_stats.iloc[5:]['poids_net'].sum()
-        
-        volumes = list(top_5_exporters['poids_net'].values) + [other_volume]
-        labels = list(top_5_exporters.index) + ['Autres']
-        colors = COLORS[:len(labels)]
-        
-        # Create pie chart
-        fig, ax = plt.subplots(figsize=(10, 8))
-        wedges, texts, autotexts = ax.pie(volumes, labels=labels, autopct='%1.1f%%',
-                                          colors=colors, shadow=True, startangle=45)
-        
-        # Beautify
-        for text in texts:
-            text.set_fontsize(11)
-        for autotext in autotexts:
-            autotext.set_fontsize(10)
-            autotext.set_fontweight('bold')
-            autotext.set_color('white')
-            
-        plt.title('Répartition du marché entre les principaux exportateurs', 
-                 fontsize=14, fontweight='bold', pad=20)
-        plt.tight_layout()
-        
-        plt.savefig('exporters_pie.png', dpi=300, bbox_inches='tight', facecolor='white')
-        self.doc.add_picture('exporters_pie.png', width=Inches(6))
-        plt.close()
+        self.add_chart('exporters_pie', width=Inches(6))
         
         # Analyse finale
         analysis = f"""
@@ -1556,9 +1548,6 @@ class DetailedCocoaReportGenerator:
         p.alignment = WD_PARAGRAPH_ALIGNMENT.JUSTIFY
         
         # Tableau des critères d'évaluation
-        criteria_table = self.doc.add_table(rows=6, cols=3)
-        criteria_table.style = 'Light Shading Accent 1'
-        
         criteria = [
             ('Dimension', 'Facteurs évalués', 'Pondération'),
             ('Risques réglementaires', 'EUDR, normes sanitaires, barrières non tarifaires', '25%'),
@@ -1567,22 +1556,12 @@ class DetailedCocoaReportGenerator:
             ('Risques géopolitiques', 'Stabilité politique, sanctions, accords commerciaux', '20%'),
             ('Risques sectoriels', 'Demande cacao, concurrence, tendances consommation', '15%')
         ]
-        
-        for i, (dim, factors, weight) in enumerate(criteria):
-            cells = criteria_table.rows[i].cells
-            cells[0].text = dim
-            cells[1].text = factors
-            cells[2].text = weight
-            if i == 0:
-                for cell in cells:
-                    for paragraph in cell.paragraphs:
-                        for run in paragraph.runs:
-                            run.font.bold = True
+        add_table(self.doc, criteria, style='Light Shading Accent 1')
                             
         self.doc.add_page_break()
         
         # 4.2 Pays-Bas
-        self.doc.add_heading('4.2 Pays-Bas - Premier marché (30.3% des exportations)', level=2)
+        self.doc.add_heading(self.market_heading('4.2', 'Pays-Bas'), level=2)
         
         nl_analysis = """
         Les Pays-Bas occupent une position centrale dans le commerce mondial du cacao, servant de 
@@ -1595,9 +1574,6 @@ class DetailedCocoaReportGenerator:
         p.alignment = WD_PARAGRAPH_ALIGNMENT.JUSTIFY
         
         # Tableau d'évaluation des risques
-        nl_risks = self.doc.add_table(rows=6, cols=4)
-        nl_risks.style = 'Light Grid Accent 1'
-        
         nl_risk_data = [
             ('Catégorie de risque', 'Niveau', 'Score', 'Description'),
             ('Réglementaire', 'Moyen', '3/5', 'EUDR 2025 impose traçabilité complète, standards durabilité stricts'),
@@ -1606,15 +1582,7 @@ class DetailedCocoaReportGenerator:
             ('Géopolitique', 'Faible', '1/5', 'Stabilité politique, membre UE, relations commerciales établies'),
             ('Sectoriel', 'Moyen', '3/5', 'Forte concurrence entre traders, pression sur les marges')
         ]
-        
-        for i, row_data in enumerate(nl_risk_data):
-            cells = nl_risks.rows[i].cells
-            for j, text in enumerate(row_data):
-                cells[j].text = text
-                if i == 0:
-                    for paragraph in cells[j].paragraphs:
-                        for run in paragraph.runs:
-                            run.font.bold = True
+        add_table(self.doc, nl_risk_data, style='Light Grid Accent 1')
                             
         nl_recommendations = """
         
@@ -1631,7 +1599,7 @@ class DetailedCocoaReportGenerator:
         p.add_run(nl_recommendations.strip())
         
         # 4.3 France
-        self.doc.add_heading('4.3 France - Marché traditionnel (11.1% des exportations)', level=2)
+        self.doc.add_heading(self.market_heading('4.3', 'France', 'Marché traditionnel'), level=2)
         
         fr_analysis = """
         La France représente un marché mature et sophistiqué pour le cacao ivoirien, avec une 
@@ -1661,7 +1629,7 @@ class DetailedCocoaReportGenerator:
         self.doc.add_page_break()
         
         # 4.4 États-Unis
-        self.doc.add_heading('4.4 États-Unis - Marché en croissance (9.4% des exportations)', level=2)
+        self.doc.add_heading(self.market_heading('4.4', 'États-Unis', 'Marché en croissance'), level=2)
         
         us_analysis = """
         Les États-Unis constituent le plus grand marché de consommation de chocolat au monde, 
@@ -1675,28 +1643,7 @@ class DetailedCocoaReportGenerator:
         p.alignment = WD_PARAGRAPH_ALIGNMENT.JUSTIFY
         
         # Graphique radar des risques USA
-        categories = ['Réglementaire', 'Change', 'Économique', 'Géopolitique', 'Sectoriel']
-        usa_scores = [2, 4, 3, 4, 2]
-        
-        fig = plt.figure(figsize=(8, 8))
-        ax = fig.add_subplot(111, polar=True)
-        
-        angles = np.linspace(0, 2 * np.pi, len(categories), endpoint=False).tolist()
-        usa_scores += usa_scores[:1]
-        angles += angles[:1]
-        
-        ax.plot(angles, usa_scores, 'o-', linewidth=2, color=COLORS[2])
-        ax.fill(angles, usa_scores, alpha=0.25, color=COLORS[2])
-        ax.set_ylim(0, 5)
-        ax.set_xticks(angles[:-1])
-        ax.set_xticklabels(categories)
-        ax.set_title('Profil de risque - États-Unis', fontsize=14, fontweight='bold', pad=20)
-        ax.grid(True)
-        
-        plt.tight_layout()
-        plt.savefig('usa_risk_radar.png', dpi=300, bbox_inches='tight', facecolor='white')
-        self.doc.add_picture('usa_risk_radar.png', width=Inches(5))
-        plt.close()
+        self.add_chart('usa_risk_radar', width=Inches(5))
         
         us_recommendations = """
         
@@ -1715,8 +1662,8 @@ class DetailedCocoaReportGenerator:
         # 4.5 à 4.8 - Autres pays (version condensée pour l'exemple)
         other_countries = [
             {
-                'name': 'Belgique - Hub chocolatier',
-                'volume': '5.9%',
+                'country': 'Belgique',
+                'label': 'Hub chocolatier',
                 'risk': 'FAIBLE',
                 'key_points': [
                     'Centre mondial du chocolat premium',
@@ -1726,8 +1673,8 @@ class DetailedCocoaReportGenerator:
                 ]
             },
             {
-                'name': 'Allemagne - Exigences qualité',
-                'volume': '5.1%',
+                'country': 'Allemagne',
+                'label': 'Exigences qualité',
                 'risk': 'MOYEN',
                 'key_points': [
                     'Standards de qualité les plus élevés d\'Europe',
@@ -1737,8 +1684,8 @@ class DetailedCocoaReportGenerator:
                 ]
             },
             {
-                'name': 'Malaisie - Marché asiatique',
-                'volume': '3.9%',
+                'country': 'Malaisie',
+                'label': 'Marché asiatique',
                 'risk': 'ÉLEVÉ',
                 'key_points': [
                     'Hub de transformation pour l\'Asie',
@@ -1748,8 +1695,8 @@ class DetailedCocoaReportGenerator:
                 ]
             },
             {
-                'name': 'Royaume-Uni - Post-Brexit',
-                'volume': '3.8%',
+                'country': 'Royaume-Uni',
+                'label': 'Post-Brexit',
                 'risk': 'ÉLEVÉ',
                 'key_points': [
                     'Incertitudes réglementaires post-Brexit',
@@ -1761,7 +1708,8 @@ class DetailedCocoaReportGenerator:
         ]
         
         for country in other_countries:
-            self.doc.add_heading(f"4.{5 + other_countries.index(country)} {country['name']} ({country['volume']} des exportations)", level=2)
+            self.doc.add_heading(self.market_heading(f"4.{5 + other_countries.index(country)}",
+                                                     country['country'], country['label']), level=2)
             
             p = self.doc.add_paragraph()
             p.add_run(f"Niveau de risque : {country['risk']}").bold = True
@@ -1775,6 +1723,7 @@ class DetailedCocoaReportGenerator:
     def add_conclusions(self):
         """Ajoute les conclusions et recommandations finales"""
         self.doc.add_heading('CONCLUSIONS ET RECOMMANDATIONS', level=1)
+        stats = self.statistics
         
         # Synthèse générale
         self.doc.add_heading('Synthèse générale', level=2)
@@ -1812,7 +1761,7 @@ class DetailedCocoaReportGenerator:
             {
                 'title': '2. Optimisation des capacités de transformation',
                 'actions': [
-                    'Programme national d\'amélioration du taux d\'utilisation à 85%',
+                    f'Programme national d\'amélioration du taux d\'utilisation de {stats.utilization_rate:.1f}% à 85%',
                     'Mécanismes de financement adaptés pour le fonds de roulement',
                     'Maintenance préventive et formation technique',
                     'Objectif : +200 000 tonnes de capacité utilisée sans nouveaux investissements'
@@ -1941,44 +1890,114 @@ class DetailedCocoaReportGenerator:
         p.add_run(disclaimer.strip())
         p.runs[0].font.italic = True
         
-    def generate_report(self):
-        """Génère le rapport complet détaillé"""
-        print("Génération du rapport détaillé en cours...")
-        
-        # Page de titre
-        self.add_title_page()
-        
-        # Table des matières
-        self.add_table_of_contents()
-        
-        # Résumé exécutif
-        self.add_executive_summary()
-        
-        # Sections principales
-        self.section_1_detailed_zes()
-        self.section_2_detailed_transformation()
-        self.section_3_detailed_destinations()
-        self.section_4_detailed_risks()
-        
-        # Conclusions
-        self.add_conclusions()
+    def add_detailed_annexes(self):
+        """Annexes détaillées : liste complète des exportateurs, déclarants et destinataires.
+
+        Les tableaux reprennent les agrégats du cube de la section 3 sans
+        limite de rang et sont écrits par tranches, quel que soit leur
+        nombre de lignes.
+        """
+        cube = self.get_aggregates()['cube']
+        total_weight = cube.total('poids_net')
         
-        # Annexes
-        self.add_annexes()
+        for dimension, (title, label) in ANNEX_TABLES.items():
+            self.doc.add_page_break()
+            self.doc.add_heading(title, level=2)
+            
+            stats = cube.rollup(dimension)
+            p = self.doc.add_paragraph()
+            p.add_run(f"{len(stats):,} {label.lower()}s, classés par volume exporté décroissant.")
+            
+            add_frame_table(self.doc, stats, [
+                ('Rang', RANK, '{:,}'),
+                (label, INDEX, '{}'),
+                ('Volume (tonnes)', lambda stats: stats['poids_net'] / 1000, '{:,.1f}'),
+                ('Part (%)', lambda stats: stats['poids_net'] / total_weight * 100, '{:.2f}%'),
+                ('Valeur FOB (M FCFA)', lambda stats: stats['valfob'] / 1000000, '{:,.1f}'),
+                ('Nb Transactions', 'id', '{:,}'),
+            ], style='Light Shading Accent 1')
+        
+    def generate_report(self, sections=None, filename=None):
+        """Génère le rapport détaillé (sections de DEFAULT_SECTIONS par défaut)"""
+        print("Génération du rapport détaillé en cours...")
+        names = [name for name in REPORT_SECTIONS if name in (sections or DEFAULT_SECTIONS)]
+        self.doc = self.new_document()
+        
+        # Seuls les agrégats et graphiques des sections demandées sont calculés
+        if any(REPORT_SECTIONS[name][1] for name in names):
+            with self.profiler.stage('agregats'):
+                self.get_aggregates()
+        charts = [chart for name in names for chart in REPORT_SECTIONS[name][2]
+                  if chart not in self.chart_images]
+        if charts:
+            with self.profiler.stage('donnees_graphiques'):
+                chart_data = self.build_chart_data(charts)
+            # Graphiques tracés en parallèle avant l'assemblage du document
+            with self.profiler.stage('graphiques'):
+                self.chart_images.update(render_charts(chart_data, max_workers=self.chart_workers,
+                                                       cache=self.chart_cache))
+                if self.charts_dir:
+                    save_charts(self.chart_images, self.charts_dir)
+        
+        # Chaque section est construite dans son propre document, puis fusionnée dans l'ordre
+        with self.profiler.stage('sections'):
+            fragments = self.build_sections(names)
+        with self.profiler.stage('assemblage'):
+            for fragment in fragments:
+                append_document(self.doc, fragment)
         
         # Sauvegarder le document
-        filename = f'Rapport_Detaille_Cacao_CI_{datetime.now().strftime("%Y%m%d")}.docx'
-        self.doc.save(filename)
+        if filename is None:
+            suffix = '' if sections is None else '_' + '-'.join(names)
+            filename = f'Rapport_Detaille_Cacao_CI_{datetime.now().strftime("%Y%m%d")}{suffix}.docx'
+        with self.profiler.stage('enregistrement'):
+            self.doc.save(filename)
         
-        # Nettoyer les fichiers temporaires
-        for file in os.listdir('.'):
-            if file.endswith('.png'):
-                os.remove(file)
-                
         print(f"✅ Rapport détaillé généré avec succès: {filename}")
-        print(f"📄 Nombre de pages estimé: ~45-50 pages")
+        if sections is None:
+            print(f"📄 Nombre de pages estimé: ~45-50 pages")
+        else:
+            print(f"📄 Sections : {', '.join(names)}")
         return filename
 
 if __name__ == "__main__":
-    generator = DetailedCocoaReportGenerator()
-    generator.generate_report()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Génère le rapport détaillé du secteur cacao")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Recalcule agrégats et graphiques sans lire ni écrire le cache")
+    parser.add_argument('--purge-cache', action='store_true',
+                        help="Vide les caches des agrégats et des graphiques avant la génération")
+    parser.add_argument('--chart-workers', type=int, default=None,
+                        help="Nombre de processus de tracé des graphiques (défaut : nombre de cœurs)")
+    parser.add_argument('--keep-charts', metavar='REPERTOIRE', default=None,
+                        help="Conserve les graphiques en PNG dans ce répertoire")
+    parser.add_argument('--section-workers', type=int, default=1,
+                        help="Nombre de processus de construction des sections (défaut : 1, dans le "
+                             "processus principal ; utile seulement pour de très gros rapports)")
+    parser.add_argument('--sections', nargs='+', choices=list(REPORT_SECTIONS), metavar='SECTION',
+                        help=f"Sections à générer, parmi : {', '.join(REPORT_SECTIONS)} "
+                             f"(défaut : toutes sauf annexes_detaillees)")
+    parser.add_argument('--profile', metavar='FICHIER.json', default=None,
+                        help="Profile chaque étape (temps, CPU, mémoire), y compris les sections construites "
+                             "par les processus de --section-workers, et enregistre le profil JSON et sa "
+                             "version .folded (flamegraph)")
+    parser.add_argument('--profile-no-alloc', action='store_true',
+                        help="Avec --profile, ne trace pas les allocations (tracemalloc ralentit l'exécution)")
+    args = parser.parse_args()
+    
+    if args.purge_cache:
+        DiskCache(AGGREGATE_CACHE_DIR, AGGREGATE_CACHE_MAX_BYTES).purge()
+        DiskCache(CHART_CACHE_DIR, CHART_CACHE_MAX_BYTES).purge()
+        print("Caches des agrégats et des graphiques vidés")
+        
+    profiler = StageProfiler(enabled=args.profile is not None, trace_allocations=not args.profile_no_alloc)
+    with profiler.stage('initialisation'):
+        generator = DetailedCocoaReportGenerator(use_cache=not args.no_cache, chart_workers=args.chart_workers,
+                                                 charts_dir=args.keep_charts, section_workers=args.section_workers,
+                                                 profiler=profiler)
+    with profiler.stage('rapport'):
+        generator.generate_report(sections=args.sections)
+    
+    if args.profile:
+        profiler.print_summary()
+        json_path, folded_path = profiler.save(args.profile)
+        print(f"✅ Profil enregistré : {json_path} (flamegraph : {folded_path})")
\ No newline at end of file
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Publication des données de la webapp.
+
+Produit, à partir du stockage colonnaire, des JSON minifiés orientés
+colonnes (un tableau par champ, les champs texte encodés par un
+dictionnaire de libellés) accompagnés de leurs variantes précompressées
+.gz et .br :
+
+    dynamic_data_columns.json  enregistrements bruts
+    dynamic_data_cube.json     cube creux destination × exportateur ×
+                               déclarant × destinataire × produit ×
+                               emballage → poids, valeur, transactions,
+                               avec l'index bitmap des filtres (filter_index)
+"""
+
+import argparse
+import gzip
+import json
+import os
+
+import numpy as np
+
+from export_store import (FILTER_FIELDS, JSON_PATH, KIND_CATEGORY, KIND_FLOAT, KIND_INT, STORE_PATH,
+                          ExportStore, export_json)
+from filter_index import FilterIndex
+
+try:
+    import brotli
+except ImportError:  # dépendance optionnelle
+    brotli = None
+
+PUBLICATION_DIR = 'WEBAPP_PUBLICATION'
+COLUMNS_FILENAME = 'dynamic_data_columns.json'
+CUBE_FILENAME = 'dynamic_data_cube.json'
+
+# Dimensions filtrables dans la webapp et mesures agrégées du cube
+CUBE_DIMENSIONS = ['destination', 'exportateur_simple', 'declarant_simple',
+                   'destinataire_simple', 'produit_simple', 'emballage_simple']
+CUBE_MEASURES = ['poids_net', 'valfob']
+CUBE_COUNT = 'transactions'
+
+
+def build_columnar_payload(store):
+    """Construit le contenu du JSON orienté colonnes"""
+    kinds = store.kinds
+    columns = {}
+    dictionaries = {}
+    for name in store.fields:
+        values = store.column(name)
+        if kinds[name] == KIND_CATEGORY:
+            dictionaries[name] = store.categories(name)
+            columns[name] = values.tolist()
+        elif kinds[name] == KIND_FLOAT:
+            columns[name] = [None if np.isnan(v) else v for v in values.tolist()]
+        else:
+            columns[name] = values.tolist()
+    return {
+        'metadata': store.metadata,
+        'filters': store.filters,
+        'count': len(store),
+        'fields': store.fields,
+        'columns': columns,
+        'dictionaries': dictionaries,
+    }
+
+
+def build_cube_payload(store):
+    """Construit le cube creux des dimensions filtrables de la webapp.
+
+    Seules les combinaisons présentes dans les données sont conservées,
+    dans l'ordre de leur première apparition. Le cube a le même format que
+    le JSON orienté colonnes : chaque cellule se lit comme un enregistrement
+    portant en plus son nombre de transactions. L'index bitmap des champs
+    filtrables accompagne les cellules.
+    """
+    kinds = store.kinds
+    dimensions = [d for d in CUBE_DIMENSIONS if kinds.get(d) == KIND_CATEGORY]
+    measures = [m for m in CUBE_MEASURES if m in kinds]
+
+    codes = np.stack([store.column(d) for d in dimensions], axis=1)
+    _, first_index, inverse = np.unique(codes, axis=0, return_index=True, return_inverse=True)
+    order = np.argsort(first_index, kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    cells = rank[inverse.ravel()]
+    size = len(order)
+
+    cell_codes = codes[first_index[order]]
+    columns = {d: cell_codes[:, i].tolist() for i, d in enumerate(dimensions)}
+    for measure in measures:
+        sums = np.bincount(cells, weights=np.nan_to_num(store.column(measure).astype(np.float64)),
+                           minlength=size)
+        columns[measure] = np.rint(sums).astype(np.int64).tolist() if kinds[measure] == KIND_INT \
+            else np.round(sums, 3).tolist()
+    columns[CUBE_COUNT] = np.bincount(cells, minlength=size).tolist()
+
+    dictionaries = {d: store.categories(d) for d in dimensions}
+    filter_fields = [d for d in dimensions if d in FILTER_FIELDS.values()]
+    index = FilterIndex.from_codes({d: cell_codes[:, dimensions.index(d)] for d in filter_fields},
+                                   {d: dictionaries[d] for d in filter_fields})
+
+    return {
+        'metadata': store.metadata,
+        'filters': store.filters,
+        'count': size,
+        'fields': dimensions + measures + [CUBE_COUNT],
+        'columns': columns,
+        'dictionaries': dictionaries,
+        'index': index.to_payload(),
+    }
+
+
+def _write_atomic(path, content):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def write_artifact(path, content):
+    """Écrit un fichier et ses variantes .gz et .br ; retourne les tailles produites"""
+    sizes = {path: len(content)}
+    _write_atomic(path, content)
+
+    compressed = gzip.compress(content, compresslevel=9, mtime=0)
+    _write_atomic(f'{path}.gz', compressed)
+    sizes[f'{path}.gz'] = len(compressed)
+
+    if brotli is not None:
+        compressed = brotli.compress(content, quality=11)
+        _write_atomic(f'{path}.br', compressed)
+        sizes[f'{path}.br'] = len(compressed)
+    return sizes
+
+
+def _publish(payload, path):
+    content = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return write_artifact(path, content)
+
+
+def publish_columns(store, output_dir=PUBLICATION_DIR):
+    """Publie le JSON orienté colonnes et ses variantes compressées"""
+    return _publish(build_columnar_payload(store), os.path.join(output_dir, COLUMNS_FILENAME))
+
+
+def publish_cube(store, output_dir=PUBLICATION_DIR):
+    """Publie le cube d'agrégats et ses variantes compressées"""
+    return _publish(build_cube_payload(store), os.path.join(output_dir, CUBE_FILENAME))
+
+
+def publish_webapp_data(store, json_path=JSON_PATH):
+    """Régénère toutes les données lues par la webapp : le JSON complet, puis,
+    dans le même répertoire, le JSON orienté colonnes et le cube.
+
+    À appeler après toute modification du stockage (ingestion, corrections),
+    pour que la webapp, qui lit d'abord le cube, n'affiche pas d'anciennes
+    valeurs. Retourne les tailles des fichiers compacts produits.
+    """
+    export_json(store, json_path)
+    output_dir = os.path.dirname(json_path) or '.'
+    sizes = publish_columns(store, output_dir)
+    sizes.update(publish_cube(store, output_dir))
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publie les données compactes de la webapp")
+    parser.add_argument('--store', default=STORE_PATH)
+    parser.add_argument('--output-dir', default=PUBLICATION_DIR)
+    args = parser.parse_args()
+
+    store = ExportStore(args.store)
+    sizes = publish_columns(store, args.output_dir)
+    sizes.update(publish_cube(store, args.output_dir))
+    for path, size in sizes.items():
+        print(f'✅ {path} ({size / 1024:,.0f} Ko)')
+    if brotli is None:
+        print('⚠️  Module brotli absent : variante .br non générée (pip install brotli)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Requêtes sur les données d'exportation.
+
+Répond aux questions ponctuelles sans générer le rapport Word : sommes de
+poids_net et valfob, nombre de transactions, classement des N premières
+valeurs d'un champ, filtres d'égalité sur les champs texte (*_simple,
+port, destination...). Les colonnes du stockage sont mappées en mémoire :
+seules celles de la requête sont lues, les filtres comparent des codes
+entiers et l'agrégation réutilise le np.bincount du cube.
+
+    python3 query_export.py --par exportateur_simple --top 10
+    python3 query_export.py --par destination --filtre produit_simple=FEVES --json
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+from export_cube import MEASURES, build_cube
+from export_store import KIND_CATEGORY, MANIFEST, STORE_PATH, ExportStore
+
+COUNT = 'transactions'
+
+
+def _check_category(store, field):
+    if store.kinds.get(field) != KIND_CATEGORY:
+        raise ValueError(f"Le champ {field} n'est pas un champ texte du stockage")
+
+
+def build_mask(store, filters):
+    """Masque des enregistrements satisfaisant tous les filtres champ → valeur.
+
+    La valeur d'un filtre peut être une liste de valeurs acceptées (par
+    exemple les codes pays d'une région). Retourne None en l'absence de
+    filtre. Une valeur inconnue ne retient aucun enregistrement.
+    """
+    mask = None
+    for field, value in filters.items():
+        _check_category(store, field)
+        categories = store.categories(field)
+        values = value if isinstance(value, (list, tuple)) else [value]
+        codes = [categories.index(v) for v in values if v in categories]
+        selected = np.concatenate([np.isin(columns[field], codes)
+                                   for columns in store.iter_segment_columns([field])])
+        mask = selected if mask is None else mask & selected
+    return mask
+
+
+def query(store, by=None, filters=None, top=None, sort='poids_net'):
+    """Exécute une requête et retourne {'total': {...}, 'groups': [...]}.
+
+    Chaque groupe porte la valeur du champ by, les sommes des mesures et
+    le nombre de transactions ; les groupes sont triés par ordre
+    décroissant de sort. Les enregistrements sans valeur pour by comptent
+    dans le total mais ne forment pas de groupe.
+    """
+    filters = filters or {}
+    measures = [m for m in MEASURES if m in store.kinds]
+    if sort not in measures + [COUNT]:
+        raise ValueError(f"Critère de tri inconnu : {sort}")
+    mask = build_mask(store, filters)
+
+    total = dict.fromkeys(measures, 0.0)
+    for columns in store.iter_segment_columns(measures, mask):
+        for measure in measures:
+            total[measure] += float(np.nansum(columns[measure]))
+    total[COUNT] = len(store) if mask is None else int(np.count_nonzero(mask))
+
+    groups = []
+    if by is not None:
+        _check_category(store, by)
+        cube = build_cube(store, [by], measures=measures, mask=mask)
+        counts = cube.counts[by]
+        present = np.flatnonzero(counts)
+        key = counts if sort == COUNT else cube.sums[by][sort]
+        present = present[np.argsort(-key[present], kind='stable')][:top]
+        for code in present:
+            group = {by: cube.labels[by][code]}
+            for measure in measures:
+                group[measure] = float(cube.sums[by][measure][code])
+            group[COUNT] = int(counts[code])
+            groups.append(group)
+
+    return {'filters': filters, 'by': by, 'total': total, 'groups': groups}
+
+
+def print_result(result):
+    """Affiche le résultat sous forme de tableau"""
+    total = result['total']
+    filters = ', '.join(f'{field}={value}' for field, value in result['filters'].items())
+    print(f"📊 {total[COUNT]:,} transactions" + (f" ({filters})" if filters else ''))
+    print(f"   Poids net : {total.get('poids_net', 0) / 1000:,.0f} t"
+          f" | Valeur FOB : {total.get('valfob', 0):,.0f}")
+
+    by = result['by']
+    if by is None:
+        return
+    weight = total.get('poids_net') or 1
+    print()
+    print(f"{'#':>4}  {by:<45}{'Poids (t)':>14}{'Part':>8}{'Valeur FOB':>20}{'Transactions':>14}")
+    for rank, group in enumerate(result['groups'], 1):
+        label = str(group[by])[:44]
+        poids = group.get('poids_net', 0)
+        print(f"{rank:>4}  {label:<45}{poids / 1000:>14,.0f}{poids / weight:>8.1%}"
+              f"{group.get('valfob', 0):>20,.0f}{group[COUNT]:>14,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Interroge les données d'exportation")
+    parser.add_argument('--par', metavar='CHAMP',
+                        help="Champ de regroupement (ex. exportateur_simple, destination)")
+    parser.add_argument('--filtre', action='append', default=[], metavar='CHAMP=VALEUR',
+                        help="Filtre d'égalité, répétable (ex. produit_simple=FEVES)")
+    parser.add_argument('--top', type=int, metavar='N', help="Limite aux N premières valeurs")
+    parser.add_argument('--tri', choices=list(MEASURES) + [COUNT], default='poids_net',
+                        help="Critère de classement (défaut : poids_net)")
+    parser.add_argument('--json', action='store_true', help="Sortie JSON")
+    parser.add_argument('--store', default=STORE_PATH)
+    args = parser.parse_args()
+
+    filters = {}
+    for item in args.filtre:
+        field, sep, value = item.partition('=')
+        if not sep:
+            parser.error(f"filtre invalide '{item}' (attendu CHAMP=VALEUR)")
+        filters[field.strip()] = value
+
+    if not os.path.exists(os.path.join(args.store, MANIFEST)):
+        parser.exit(1, f'❌ Stockage introuvable : {args.store} (python3 export_store.py convert)\n')
+
+    try:
+        result = query(ExportStore(args.store, mmap=True), args.par, filters, args.top, args.tri)
+    except ValueError as error:
+        parser.exit(1, f'❌ {error}\n')
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print_result(result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Correction des entités (exportateurs, déclarants, destinataires) à partir
+d'une table de correspondance.
+
+La table est un fichier CSV avec les colonnes champ, ancien, nouveau et,
+optionnellement, mode :
+
+    champ,ancien,nouveau,mode
+    exportateur_simple,SCOMCAO,S3C,exact
+    exportateur,SCOMCAO,S3C,contient
+
+En mode exact, la valeur entière est remplacée ; en mode contient, chaque
+occurrence de l'ancien texte est remplacée dans la valeur. Les corrections
+portent sur les tables de libellés du stockage colonnaire : les segments ne
+sont relus un à un que lorsque deux libellés fusionnent. Les listes de
+filtres sont corrigées dans la même passe, puis les données de la webapp
+(JSON complet, colonnes et cube) sont régénérées avec écriture atomique.
+"""
+
+import argparse
+import csv
+from collections import defaultdict
+
+from export_store import FILTER_FIELDS, JSON_PATH, KIND_CATEGORY, STORE_PATH, ExportStore
+from publish_webapp import publish_webapp_data
+
+MODE_EXACT = 'exact'
+MODE_CONTAINS = 'contient'
+
+
+def load_rules(path):
+    """Lit la table de correspondance : champ → liste de (ancien, nouveau, mode)"""
+    rules = defaultdict(list)
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for line, row in enumerate(csv.DictReader(f), 2):
+            mode = (row.get('mode') or MODE_EXACT).strip()
+            if mode not in (MODE_EXACT, MODE_CONTAINS):
+                raise ValueError(f"{path}:{line} : mode inconnu '{mode}'")
+            rules[row['champ'].strip()].append((row['ancien'], row['nouveau'], mode))
+    return dict(rules)
+
+
+def build_mapper(field_rules):
+    """Construit la fonction de correction d'un champ"""
+    exact = {old: new for old, new, mode in field_rules if mode == MODE_EXACT}
+    contains = [(old, new) for old, new, mode in field_rules if mode == MODE_CONTAINS]
+
+    def mapper(value):
+        value = exact.get(value, value)
+        for old, new in contains:
+            value = value.replace(old, new)
+        return value
+
+    return mapper
+
+
+def remap_store(store, rules):
+    """Applique les corrections au stockage et à ses filtres.
+
+    Retourne, pour chaque champ, le nombre d'enregistrements modifiés.
+    Les totaux des métadonnées ne dépendent pas des libellés et restent
+    inchangés.
+    """
+    kinds = store.kinds
+    for field in rules:
+        if kinds.get(field) != KIND_CATEGORY:
+            raise ValueError(f"Le champ {field} n'est pas un champ texte du stockage")
+
+    counts = {}
+    for field, field_rules in rules.items():
+        mapper = build_mapper(field_rules)
+        counts[field] = store.remap_categories(field, mapper)
+        for filter_name, filter_field in FILTER_FIELDS.items():
+            values = store.filters.get(filter_name)
+            if filter_field != field or not values:
+                continue
+            if any(mapper(value) != value for value in values):
+                store.filters[filter_name] = sorted({mapper(value) for value in values})
+
+    store.save_manifest()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Corrige des entités à partir d'une table de correspondance")
+    parser.add_argument('mapping', help="Table de correspondance CSV (champ, ancien, nouveau, mode)")
+    parser.add_argument('--store', default=STORE_PATH)
+    parser.add_argument('--json', default=JSON_PATH)
+    parser.add_argument('--no-export-json', action='store_true',
+                        help="Ne régénère pas les données de la webapp (JSON, colonnes et cube)")
+    args = parser.parse_args()
+
+    try:
+        rules = load_rules(args.mapping)
+        counts = remap_store(ExportStore(args.store), rules)
+    except ValueError as error:
+        parser.exit(1, f'❌ {error}\n')
+
+    for field, count in counts.items():
+        print(f'✅ {field} : {count} transactions corrigées')
+    print('✅ Filtres mis à jour')
+
+    if not args.no_export_json:
+        publish_webapp_data(ExportStore(args.store), args.json)
+        print(f'✅ {args.json}, colonnes et cube de la webapp régénérés')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Graphiques du rapport détaillé.
+
+Chaque graphique est une fonction pure qui reçoit ses séries de données
+(listes et nombres simples) et retourne une figure matplotlib. Le rendu
+en PNG à 300 dpi, en mémoire, est réparti sur un pool de processus avant
+l'assemblage du document Word.
+
+matplotlib n'est importé qu'au premier tracé, par configure_matplotlib()
+(backend Agg, style et rcParams) : importer ce module, ou calculer les
+empreintes du cache, ne coûte rien lorsque tous les graphiques sont déjà
+en cache. Les fonctions de tracé appelées directement doivent être
+précédées de configure_matplotlib().
+"""
+
+import hashlib
+import inspect
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from importlib.metadata import version
+
+import numpy as np
+
+# Couleurs professionnelles
+COLORS = ['#2c3e50', '#34495e', '#3498db', '#2980b9', '#16a085',
+          '#27ae60', '#f39c12', '#e67e22', '#9b59b6', '#8e44ad']
+
+DPI = 300
+STYLE = 'seaborn-v0_8-whitegrid'
+RC_PARAMS = {
+    'font.family': 'Arial',
+    'font.size': 11,
+    'figure.figsize': (10, 8),
+    'figure.dpi': DPI,
+}
+
+# matplotlib.pyplot, importé par configure_matplotlib()
+plt = None
+
+
+def configure_matplotlib():
+    """Importe matplotlib avec le backend Agg et applique le style commun à tous les graphiques"""
+    global plt
+    if plt is not None:
+        return
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as pyplot
+    pyplot.style.use(STYLE)
+    pyplot.rcParams.update(RC_PARAMS)
+    plt = pyplot
+
+
+def capacity_comparison(data):
+    """Barres groupées capacité installée / utilisée des 10 premières sociétés"""
+    x = np.arange(len(data['names']))
+    width = 0.35
+
+    fig, ax = plt.subplots(figsize=(12, 8))
+    bars1 = ax.bar(x - width/2, data['installed'], width, label='Capacité installée', color=COLORS[0])
+    bars2 = ax.bar(x + width/2, data['used'], width, label='Capacité utilisée', color=COLORS[2])
+
+    ax.set_xlabel('Sociétés', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Capacité (milliers de tonnes/an)', fontsize=12, fontweight='bold')
+    ax.set_title('Top 10 des sociétés de transformation par capacité', fontsize=14, fontweight='bold')
+    ax.set_xticks(x)
+    ax.set_xticklabels(data['names'], rotation=45, ha='right')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+
+    # Ajouter les valeurs sur les barres
+    for bars in [bars1, bars2]:
+        for bar in bars:
+            height = bar.get_height()
+            ax.annotate(f'{height:.0f}',
+                       xy=(bar.get_x() + bar.get_width() / 2, height),
+                       xytext=(0, 3),
+                       textcoords="offset points",
+                       ha='center', va='bottom',
+                       fontsize=9)
+
+    fig.tight_layout()
+    return fig
+
+
+def capacity_evolution(data):
+    """Courbe d'évolution prévue des capacités de transformation"""
+    years = data['years']
+    capacities = data['capacities']
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.plot(years, capacities, marker='o', linewidth=3, markersize=10, color=COLORS[0])
+    ax.fill_between(range(len(years)), capacities, alpha=0.3, color=COLORS[0])
+
+    for i, cap in enumerate(capacities):
+        ax.annotate(f'{cap:.0f}k t/an',
+                    xy=(i, cap),
+                    xytext=(0, 20),
+                    textcoords='offset points',
+                    ha='center',
+                    fontsize=12,
+                    fontweight='bold')
+
+    ax.set_xlabel('Période', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Capacité (milliers de tonnes/an)', fontsize=12, fontweight='bold')
+    ax.set_title('Évolution prévue des capacités de transformation', fontsize=14, fontweight='bold')
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+def destinations_pie(data):
+    """Camembert des pays destination"""
+    labels = data['labels']
+    colors = COLORS[:len(labels)]
+    explode = [0.05] + [0] * (len(labels) - 1)  # Explode first slice
+
+    fig, ax = plt.subplots(figsize=(10, 8))
+    ax.pie(data['weights'], labels=labels, autopct='%1.1f%%', colors=colors, explode=explode,
+           shadow=True, startangle=90)
+    ax.set_title('Répartition des exportations par pays destination', fontsize=16, fontweight='bold', pad=20)
+    fig.tight_layout()
+    return fig
+
+
+def products_bar(data):
+    """Barres horizontales des volumes par type de produit"""
+    products = data['labels']
+    volumes = data['volumes']
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.barh(products, volumes, color=COLORS[0])
+
+    # Ajouter les valeurs sur les barres
+    for i, volume in enumerate(volumes):
+        ax.text(volume + max(volumes)*0.01, i, f'{volume:,.0f}k t',
+                va='center', fontsize=10, fontweight='bold')
+
+    ax.set_xlabel('Volume (milliers de tonnes)', fontsize=12, fontweight='bold')
+    ax.set_title('Répartition des exportations par type de produit', fontsize=14, fontweight='bold')
+    ax.grid(True, axis='x', alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+def ports_donut(data):
+    """Anneau de répartition du volume par port"""
+    from matplotlib.patches import Circle
+
+    fig, ax = plt.subplots(figsize=(10, 8))
+    wedges, texts, autotexts = ax.pie(data['sizes'], labels=data['labels'], autopct='%1.1f%%',
+                                      colors=[COLORS[0], COLORS[2]], startangle=90,
+                                      wedgeprops=dict(width=0.5))
+
+    ax.set_title('Répartition du volume d\'exportation par port', fontsize=16, fontweight='bold', pad=20)
+
+    for text in texts:
+        text.set_fontsize(12)
+        text.set_fontweight('bold')
+    for autotext in autotexts:
+        autotext.set_color('white')
+        autotext.set_fontsize(14)
+        autotext.set_fontweight('bold')
+
+    # Cercle central et volume total
+    ax.add_artist(Circle((0, 0), 0.70, fc='white'))
+    ax.text(0, 0, f"{data['total_weight']/1000000:.1f}M\ntonnes",
+            ha='center', va='center', fontsize=16, fontweight='bold')
+
+    fig.tight_layout()
+    return fig
+
+
+def packaging_bar(data):
+    """Barres des volumes par type d'emballage"""
+    labels = data['labels']
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    bars = ax.bar(labels, data['volumes'],
+                  color=[COLORS[i % len(COLORS)] for i in range(len(labels))])
+
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+               f'{height:,.0f}k t',
+               ha='center', va='bottom', fontweight='bold')
+
+    ax.set_ylabel('Volume (milliers de tonnes)', fontsize=12, fontweight='bold')
+    ax.set_title('Types d\'emballage utilisés pour l\'exportation', fontsize=14, fontweight='bold')
+    ax.set_xticklabels(labels, rotation=45, ha='right')
+    ax.grid(True, axis='y', alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+def declarants_bar(data):
+    """Barres horizontales des 10 premiers déclarants"""
+    volumes = data['volumes']
+    y_pos = np.arange(len(volumes))
+
+    fig, ax = plt.subplots(figsize=(10, 8))
+    ax.barh(y_pos, volumes, color=COLORS[1])
+    ax.set_yticks(y_pos, data['labels'])
+    ax.set_xlabel('Volume (milliers de tonnes)', fontsize=12, fontweight='bold')
+    ax.set_title('Top 10 des déclarants en douane', fontsize=14, fontweight='bold')
+    ax.invert_yaxis()
+
+    for i, v in enumerate(volumes):
+        ax.text(v + 1, i, f'{v:,.0f}k t', va='center', fontweight='bold')
+
+    ax.grid(True, axis='x', alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+def exporters_pie(data):
+    """Camembert des parts de marché des principaux exportateurs"""
+    labels = data['labels']
+
+    fig, ax = plt.subplots(figsize=(10, 8))
+    wedges, texts, autotexts = ax.pie(data['volumes'], labels=labels, autopct='%1.1f%%',
+                                      colors=COLORS[:len(labels)], shadow=True, startangle=45)
+
+    for text in texts:
+        text.set_fontsize(11)
+    for autotext in autotexts:
+        autotext.set_fontsize(10)
+        autotext.set_fontweight('bold')
+        autotext.set_color('white')
+
+    ax.set_title('Répartition du marché entre les principaux exportateurs',
+                 fontsize=14, fontweight='bold', pad=20)
+    fig.tight_layout()
+    return fig
+
+
+def risk_radar(data):
+    """Radar des scores de risque d'un pays"""
+    categories = data['categories']
+    scores = data['scores'] + data['scores'][:1]
+    angles = np.linspace(0, 2 * np.pi, len(categories), endpoint=False).tolist()
+    angles += angles[:1]
+
+    fig = plt.figure(figsize=(8, 8))
+    ax = fig.add_subplot(111, polar=True)
+    ax.plot(angles, scores, 'o-', linewidth=2, color=COLORS[2])
+    ax.fill(angles, scores, alpha=0.25, color=COLORS[2])
+    ax.set_ylim(0, 5)
+    ax.set_xticks(angles[:-1])
+    ax.set_xticklabels(categories)
+    ax.set_title(data['title'], fontsize=14, fontweight='bold', pad=20)
+    ax.grid(True)
+    fig.tight_layout()
+    return fig
+
+
+# Graphiques du rapport : fonction de tracé et options d'enregistrement
+CHARTS = {
+    'capacity_comparison': (capacity_comparison, {}),
+    'capacity_evolution': (capacity_evolution, {}),
+    'destinations_pie': (destinations_pie, {'facecolor': 'white'}),
+    'products_bar': (products_bar, {'facecolor': 'white'}),
+    'ports_donut': (ports_donut, {'facecolor': 'white'}),
+    'packaging_bar': (packaging_bar, {'facecolor': 'white'}),
+    'declarants_bar': (declarants_bar, {'facecolor': 'white'}),
+    'exporters_pie': (exporters_pie, {'facecolor': 'white'}),
+    'usa_risk_radar': (risk_radar, {'facecolor': 'white'}),
+}
+
+
+def render_chart(name, data):
+    """Trace un graphique et retourne son image PNG en mémoire"""
+    configure_matplotlib()
+    plot, savefig_kwargs = CHARTS[name]
+    fig = plot(data)
+    buffer = io.BytesIO()
+    try:
+        fig.savefig(buffer, format='png', dpi=DPI, bbox_inches='tight', **savefig_kwargs)
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
+
+
+def chart_key(name, data):
+    """Empreinte d'un graphique : données, code de tracé (dont la taille), dpi et style"""
+    plot, savefig_kwargs = CHARTS[name]
+    payload = json.dumps({
+        'name': name,
+        'data': data,
+        'source': inspect.getsource(plot),
+        'savefig': savefig_kwargs,
+        'dpi': DPI,
+        'style': STYLE,
+        'rc_params': RC_PARAMS,
+        'matplotlib': version('matplotlib'),
+    }, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def render_charts(chart_data, max_workers=None, cache=None):
+    """Trace tous les graphiques, en parallèle si plusieurs processus sont disponibles.
+
+    chart_data associe le nom d'un graphique à ses données. Retourne le
+    contenu PNG de chaque graphique, sans passer par le disque. Si un cache
+    (DiskCache) est fourni, seuls les graphiques absents du cache sont tracés.
+    """
+    images = {}
+    keys = {}
+    if cache is not None:
+        for name, data in chart_data.items():
+            keys[name] = chart_key(name, data)
+            image = cache.get(keys[name])
+            if image is not None:
+                images[name] = image
+    pending = {name: data for name, data in chart_data.items() if name not in images}
+
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(pending) <= 1:
+        rendered = {name: render_chart(name, data) for name, data in pending.items()}
+    else:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(pending)),
+                                 initializer=configure_matplotlib) as executor:
+            futures = {name: executor.submit(render_chart, name, data)
+                       for name, data in pending.items()}
+            rendered = {name: future.result() for name, future in futures.items()}
+
+    if cache is not None:
+        for name, image in rendered.items():
+            cache.put(keys[name], image)
+    images.update(rendered)
+    return {name: images[name] for name in chart_data}
+
+
+def save_charts(images, output_dir):
+    """Enregistre les images PNG dans un répertoire (artefact optionnel)"""
+    os.makedirs(output_dir, exist_ok=True)
+    for name, image in images.items():
+        with open(os.path.join(output_dir, f'{name}.png'), 'wb') as f:
+            f.write(image)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Statistiques dérivées partagées par les sections du rapport.
+
+Les totaux de capacité, taux d'utilisation et croissances sont calculés en
+une passe sur les sociétés de broyage, à la construction ; les chiffres
+d'exportation (totaux, nombre de pays, parts par pays et par région) sont
+lus à la première utilisation dans le cube de la section 3, si bien
+qu'une section qui ne parle que de capacités n'ouvre pas le stockage des
+exportations. Toutes les sections citent ainsi les mêmes valeurs.
+"""
+
+from functools import cached_property
+
+# Lignes de broyage_data.json qui ne sont pas des sociétés
+EXCLUDED_ROWS = ['TOTAL', 'Estimation de la récolte annuelle de cacao']
+
+CAPACITY_FIELDS = ['capacite_installee', 'capacite_utilisee', 'projets_confirmer',
+                   'previsions_2027_28', 'extensions_confirmer', 'previsions_2029_30']
+
+# Chiffres des exportations mis en cache, qui dépendent du périmètre
+EXPORT_PROPERTIES = ['export_metadata', 'export_cube', 'country_ranking', 'region_shares']
+
+
+def select_companies(broyage_data):
+    """Sociétés de broyage, hors lignes de total et d'estimation de récolte"""
+    return [c for c in broyage_data if c['societe'] not in EXCLUDED_ROWS]
+
+
+def capacity(company, field):
+    """Valeur d'un champ de capacité d'une société, 0 si elle n'est pas renseignée"""
+    return company.get(field) or 0
+
+
+def utilization_rate(installed, used):
+    """Taux d'utilisation en %, 0 sans capacité installée"""
+    return (used / installed * 100) if installed > 0 else 0
+
+
+def growth_rate(start, end):
+    """Croissance de start à end en %, 0 sans valeur de départ"""
+    return ((end - start) / start * 100) if start > 0 else 0
+
+
+class ReportStatistics:
+    """Capacités de transformation et chiffres des exportations, calculés une fois"""
+
+    def __init__(self, companies, export_metadata, export_cube):
+        """export_metadata et export_cube : fonctions sans argument retournant les totaux
+        et le cube (ExportCube) des exportations"""
+        self.companies = companies
+        self._export_metadata = export_metadata
+        self._export_cube = export_cube
+
+        totals = dict.fromkeys(CAPACITY_FIELDS, 0)
+        for company in companies:
+            for field in CAPACITY_FIELDS:
+                totals[field] += capacity(company, field)
+        self.totals = totals
+        self.company_count = len(companies)
+        self.total_installed = totals['capacite_installee']
+        self.total_used = totals['capacite_utilisee']
+        self.total_2027 = totals['previsions_2027_28']
+        self.total_2030 = totals['previsions_2029_30']
+        self.new_projects = totals['projets_confirmer']
+
+        self.unused_capacity = self.total_installed - self.total_used
+        self.utilization_rate = utilization_rate(self.total_installed, self.total_used)
+        self.growth_2027 = growth_rate(self.total_installed, self.total_2027)
+        self.growth_2030 = growth_rate(self.total_installed, self.total_2030)
+        self.multiplier_2030 = self.total_2030 / self.total_installed if self.total_installed else 0
+
+    def top_companies(self, count):
+        """Les count premières sociétés par capacité installée"""
+        return sorted(self.companies, key=lambda x: capacity(x, 'capacite_installee'), reverse=True)[:count]
+
+    def reset_exports(self):
+        """Oublie les chiffres des exportations, relus à la prochaine utilisation.
+
+        Les capacités ne dépendent pas du périmètre et sont conservées.
+        """
+        for name in EXPORT_PROPERTIES:
+            self.__dict__.pop(name, None)
+
+    @cached_property
+    def export_metadata(self):
+        return self._export_metadata()
+
+    @property
+    def export_weight(self):
+        return self.export_metadata['total_weight']
+
+    @property
+    def export_value(self):
+        return self.export_metadata['total_value']
+
+    @property
+    def export_records(self):
+        return self.export_metadata['total_records']
+
+    @cached_property
+    def export_cube(self):
+        return self._export_cube()
+
+    @property
+    def destination_count(self):
+        """Nombre de pays de destination (codes distincts)"""
+        return self.export_cube.nunique('destination')
+
+    def country_share(self, country):
+        """Part du volume exporté vers un pays (nom français), en %"""
+        return self.export_cube.share('country_name', country)
+
+    @cached_property
+    def country_ranking(self):
+        """Pays de destination nommés (hors 'Autres'), par volume décroissant"""
+        return [country for country in self.export_cube.rollup('country_name').index if country != 'Autres']
+
+    def country_rank(self, country):
+        """Rang (1 = premier) d'un pays parmi les destinations, None s'il est absent"""
+        ranking = self.country_ranking
+        return ranking.index(country) + 1 if country in ranking else None
+
+    @property
+    def leading_country(self):
+        """Premier pays de destination en volume et sa part (en %), (None, 0.0) sans exportations"""
+        if not self.country_ranking:
+            return None, 0.0
+        return self.country_ranking[0], self.country_share(self.country_ranking[0])
+
+    @cached_property
+    def region_shares(self):
+        """Parts du volume exporté par région, en %, par ordre décroissant"""
+        stats = self.export_cube.rollup('region')
+        total = self.export_cube.total('poids_net')
+        if not total:
+            return {}
+        return {region: float(weight / total * 100) for region, weight in stats['poids_net'].items()}
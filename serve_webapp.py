@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Serveur HTTP local de la webapp (asyncio, bibliothèque standard uniquement).
+
+Sert les fichiers statiques de WEBAPP_PUBLICATION (variante .gz lorsque le
+navigateur l'accepte) et des agrégats calculés sur le stockage colonnaire
+pour un jeu de filtres donné :
+
+    GET /api/resume?produit_simple=FEVES
+    GET /api/top?par=port&top=5&tri=valfob
+    GET /api/destinations?top=10&exportateur_simple=S3C
+    GET /api/exportateurs?destination=NL
+    GET /api/clients?produit_simple=MASSE
+
+Tout paramètre portant le nom d'un champ texte est un filtre d'égalité.
+Les réponses de l'API sont gardées dans un cache LRU, vidé lorsque le
+stockage change ; toutes les réponses portent un ETag et les requêtes
+conditionnelles (If-None-Match) reçoivent un 304 sans corps.
+
+Les requêtes sont traitées dans des threads (asyncio.to_thread) : une
+agrégation longue ne bloque pas la boucle d'événements ni les autres
+connexions.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+from collections import OrderedDict
+from email.utils import formatdate
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+
+from export_store import MANIFEST, STORE_PATH, ExportStore
+from query_export import build_mask, query
+
+STATIC_DIR = 'WEBAPP_PUBLICATION'
+CACHE_ENTRIES = 256
+RESERVED_PARAMS = {'par', 'top', 'tri'}
+
+# Tableaux de la webapp : champ de regroupement et champs dont on compte les valeurs distinctes
+TABLES = {
+    'exportateurs': ('exportateur_simple', ['destination', 'produit_simple', 'destinataire_simple',
+                                            'declarant_simple', 'emballage_simple']),
+    'clients': ('destinataire_simple', ['exportateur_simple', 'destination', 'produit_simple',
+                                        'declarant_simple', 'emballage_simple']),
+}
+
+STATUS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+          405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+class ResponseCache:
+    """Cache LRU en mémoire : clé → (corps, ETag), partagé par les threads"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+def _pairs(store, by, other, mask, measure=None):
+    """Colonnes (by, other[, measure]) des enregistrements retenus où by et other sont renseignés"""
+    columns = [store.column(name, mask) for name in [by, other] + ([measure] if measure else [])]
+    valid = (columns[0] >= 0) & (columns[1] >= 0)
+    return [column[valid] for column in columns]
+
+
+def distinct_counts(store, by, other, mask=None):
+    """Nombre de valeurs distinctes de other pour chaque code de by"""
+    by_codes, other_codes = _pairs(store, by, other, mask)
+    width = max(len(store.categories(other)), 1)
+    pairs = np.unique(by_codes.astype(np.int64) * width + other_codes)
+    return np.bincount(pairs // width, minlength=len(store.categories(by)))
+
+
+def leading_values(store, by, other, mask=None, measure='poids_net'):
+    """Pour chaque code de by, code de other de plus forte mesure (-1 si aucun)"""
+    by_codes, other_codes, values = _pairs(store, by, other, mask, measure)
+    width = max(len(store.categories(other)), 1)
+    keys = by_codes.astype(np.int64) * width + other_codes
+    size = len(store.categories(by)) * width
+    counts = np.bincount(keys, minlength=size).reshape(-1, width)
+    sums = np.bincount(keys, weights=np.nan_to_num(values.astype(np.float64)),
+                       minlength=size).reshape(-1, width)
+    leaders = sums.argmax(axis=1)
+    leaders[counts.sum(axis=1) == 0] = -1
+    return leaders
+
+
+class ExportAPI:
+    """Points d'entrée de l'API, calculés sur le stockage colonnaire"""
+
+    def __init__(self, store_path=STORE_PATH, cache_entries=CACHE_ENTRIES):
+        self.store_path = store_path
+        self.cache = ResponseCache(cache_entries)
+        self.store = None
+        self.version = None
+        self.lock = threading.Lock()
+        self.endpoints = {
+            'resume': self.summary,
+            'top': self.top,
+            'destinations': self.destinations,
+            'exportateurs': self.table,
+            'clients': self.table,
+        }
+
+    def _current_store(self):
+        """(stockage courant, version), rechargé (et cache vidé) si le manifeste a changé"""
+        version = os.stat(os.path.join(self.store_path, MANIFEST)).st_mtime_ns
+        with self.lock:
+            if version != self.version:
+                self.store = ExportStore(self.store_path, mmap=True)
+                self.version = version
+                self.cache.clear()
+            return self.store, self.version
+
+    def respond(self, endpoint, params):
+        """Retourne (statut, corps JSON, ETag) pour un point d'entrée"""
+        if endpoint not in self.endpoints:
+            return 404, _json_body({'erreur': f'Point d\'entrée inconnu : {endpoint}'}), None
+        store, version = self._current_store()
+        # La version fait partie de la clé : une réponse calculée sur l'ancien
+        # stockage et mise en cache après un rechargement ne sera jamais servie
+        key = (version, endpoint, tuple(sorted(params.items())))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return (200,) + cached
+
+        try:
+            filters = {k: v for k, v in params.items() if k not in RESERVED_PARAMS}
+            top = int(params['top']) if params.get('top') else None
+            data = self.endpoints[endpoint](store, endpoint, params, filters, top)
+        except ValueError as error:
+            return 400, _json_body({'erreur': str(error)}), None
+
+        body = _json_body(data)
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.cache.put(key, (body, etag))
+        return 200, body, etag
+
+    def summary(self, store, endpoint, params, filters, top):
+        result = query(store, filters=filters)
+        return {'filters': filters, 'total': result['total']}
+
+    def top(self, store, endpoint, params, filters, top):
+        if not params.get('par'):
+            raise ValueError("Paramètre 'par' manquant")
+        return query(store, params['par'], filters, top, params.get('tri', 'poids_net'))
+
+    def destinations(self, store, endpoint, params, filters, top):
+        result = query(store, 'destination', filters, top, params.get('tri', 'poids_net'))
+        mask = build_mask(store, filters)
+        codes = {label: code for code, label in enumerate(store.categories('destination'))}
+        leaders = {other: leading_values(store, 'destination', other, mask)
+                   for other in ('exportateur_simple', 'declarant_simple')}
+        for group in result['groups']:
+            code = codes[group['destination']]
+            for other, values in leaders.items():
+                leader = values[code]
+                group[f'premier_{other}'] = store.categories(other)[leader] if leader >= 0 else None
+        return result
+
+    def table(self, store, endpoint, params, filters, top):
+        by, others = TABLES[endpoint]
+        result = query(store, by, filters, top, params.get('tri', 'poids_net'))
+        mask = build_mask(store, filters)
+        codes = {label: code for code, label in enumerate(store.categories(by))}
+        distinct = {other: distinct_counts(store, by, other, mask)
+                    for other in others if other in store.kinds}
+        for group in result['groups']:
+            code = codes[group[by]]
+            group['distincts'] = {other: int(values[code]) for other, values in distinct.items()}
+        return result
+
+
+def _json_body(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _static_file(static_dir, path, accept_encoding):
+    """Chemin du fichier statique à servir et son encodage, ou None"""
+    root = os.path.realpath(static_dir)
+    relative = unquote(path).lstrip('/') or 'index.html'
+    full_path = os.path.realpath(os.path.join(root, relative))
+    if os.path.commonpath([root, full_path]) != root or not os.path.isfile(full_path):
+        return None, None
+    compressed = f'{full_path}.gz'
+    if ('gzip' in accept_encoding and os.path.isfile(compressed)
+            and os.path.getmtime(compressed) >= os.path.getmtime(full_path)):
+        return full_path, 'gzip'
+    return full_path, None
+
+
+def _response(status, body=b'', headers=None, head_only=False):
+    lines = [f'HTTP/1.1 {status} {STATUS[status]}',
+             f'Date: {formatdate(usegmt=True)}',
+             'Connection: close']
+    headers = dict(headers or {})
+    if status != 304:
+        headers['Content-Length'] = str(len(body))
+    lines.extend(f'{name}: {value}' for name, value in headers.items())
+    head = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+    if status == 304 or head_only:
+        return head
+    return head + body
+
+
+def handle_request(api, static_dir, method, target, headers):
+    """Construit la réponse HTTP complète d'une requête"""
+    if method not in ('GET', 'HEAD'):
+        return _response(405, headers={'Allow': 'GET, HEAD'})
+    head_only = method == 'HEAD'
+    url = urlsplit(target)
+
+    if url.path.startswith('/api/'):
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        status, body, etag = api.respond(url.path[len('/api/'):].strip('/'), params)
+        response_headers = {'Content-Type': 'application/json; charset=utf-8',
+                            'Cache-Control': 'no-cache'}
+    else:
+        path, encoding = _static_file(static_dir, url.path, headers.get('accept-encoding', ''))
+        if path is None:
+            return _response(404, b'Not Found', {'Content-Type': 'text/plain'}, head_only)
+        served = f'{path}.gz' if encoding else path
+        stat = os.stat(served)
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        status, body = 200, None
+        response_headers = {'Content-Type': mimetypes.guess_type(path)[0] or 'application/octet-stream',
+                            'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+        if encoding:
+            response_headers['Content-Encoding'] = encoding
+
+    if etag is not None:
+        response_headers['ETag'] = etag
+        if etag in [tag.strip() for tag in headers.get('if-none-match', '').split(',')]:
+            return _response(304, headers=response_headers)
+    if body is None:
+        with open(served, 'rb') as f:
+            body = f.read()
+    return _response(status, body, response_headers, head_only)
+
+
+async def handle_connection(reader, writer, api, static_dir):
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+        request_line, *header_lines = head.decode('latin-1').split('\r\n')
+        method, target, _ = request_line.split(' ', 2)
+        headers = {}
+        for line in header_lines:
+            name, sep, value = line.partition(':')
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+        try:
+            response = await asyncio.to_thread(handle_request, api, static_dir, method, target, headers)
+        except Exception as error:
+            # Les erreurs de paramètres sont déjà des 400 (ExportAPI.respond) : le reste est interne
+            print(f'❌ {method} {target} : {error!r}')
+            response = _response(500, _json_body({'erreur': 'Erreur interne du serveur'}),
+                                 {'Content-Type': 'application/json; charset=utf-8'})
+        writer.write(response)
+        await writer.drain()
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host, port, api, static_dir):
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_connection(reader, writer, api, static_dir), host, port)
+    print(f'✅ Webapp et API disponibles sur http://{host}:{port}/')
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur local de la webapp et de son API d'agrégats")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--store', default=STORE_PATH)
+    parser.add_argument('--static-dir', default=STATIC_DIR)
+    parser.add_argument('--cache', type=int, default=CACHE_ENTRIES, metavar='N',
+                        help="Nombre de réponses gardées dans le cache LRU")
+    args = parser.parse_args()
+
+    if not os.path.exists(os.path.join(args.store, MANIFEST)):
+        parser.exit(1, f'❌ Stockage introuvable : {args.store} (python3 export_store.py convert)\n')
+
+    try:
+        asyncio.run(serve(args.host, args.port, ExportAPI(args.store, args.cache), args.static_dir))
+    except KeyboardInterrupt:
+        print('\n✅ Serveur arrêté')
+
+
+if __name__ == '__main__':
+    main()
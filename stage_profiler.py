@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Profilage par étape de la génération du rapport.
+
+Chaque étape (chargement, agrégats, graphiques, sections, enregistrement...)
+est délimitée par un bloc with profiler.stage(nom) ; les étapes peuvent
+être imbriquées. Pour chacune sont mesurés :
+
+- le temps écoulé et le temps CPU du processus, ainsi que le temps CPU des
+  processus enfants terminés pendant l'étape (pools de graphiques et de
+  sections) ;
+- le pic de mémoire résidente (RSS) du processus à la fin de l'étape ;
+- avec trace_allocations, le pic de mémoire allouée par Python pendant
+  l'étape (tracemalloc, qui ralentit l'exécution) et la variation nette du
+  nombre de blocs alloués par Python entre le début et la fin de l'étape.
+
+Le temps CPU des processus enfants et le RSS reposent sur le module
+resource, absent sous Windows : ces mesures y valent None.
+
+Les étapes mesurées dans d'autres processus (pool de construction des
+sections) sont rattachées à l'étape en cours avec merge() ; chaque mesure
+porte le pid du processus qui l'a produite.
+
+Le profil est enregistré en JSON et au format « collapsed stacks »
+(une ligne par pile, temps propre en microsecondes), lu directement par
+flamegraph.pl, speedscope ou inferno :
+
+    python3 generate_detailed_cocoa_report.py --profile profil.json
+    flamegraph.pl profil.folded > profil.svg
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss est en kilo-octets sous Linux, en octets sous macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def _children_cpu():
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _cell(value, width, spec):
+    """Valeur formatée sur width caractères, « - » si la mesure n'est pas disponible"""
+    return f'{value:>{width}{spec}}' if value is not None else f"{'-':>{width}}"
+
+
+class StageProfiler:
+    """Mesures par étape ; désactivé, stage() ne mesure rien"""
+
+    def __init__(self, enabled=True, trace_allocations=True):
+        self.enabled = enabled
+        self.trace_allocations = trace_allocations
+        self.stages = []
+        self.stack = []
+        self.peaks = []
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+        if self.trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        record = {'stage': ';'.join(self.stack + [name]), 'depth': len(self.stack), 'pid': os.getpid()}
+        self.stages.append(record)
+        self.stack.append(name)
+        if self.trace_allocations:
+            # Le pic de l'étape englobante est mis de côté avant la remise à zéro
+            self._fold_peak()
+            tracemalloc.reset_peak()
+            self.peaks.append(0)
+            blocks = sys.getallocatedblocks()
+        cpu = time.process_time()
+        children_cpu = _children_cpu()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record['wall_s'] = time.perf_counter() - start
+            record['cpu_s'] = time.process_time() - cpu
+            record['children_cpu_s'] = _children_cpu() - children_cpu if children_cpu is not None else None
+            record['peak_rss_mb'] = _peak_rss_mb()
+            if self.trace_allocations:
+                self._fold_peak()
+                peak = self.peaks.pop()
+                record['peak_alloc_mb'] = peak / (1024 * 1024)
+                record['net_allocated_blocks'] = sys.getallocatedblocks() - blocks
+                if self.peaks:
+                    self.peaks[-1] = max(self.peaks[-1], peak)
+                tracemalloc.reset_peak()
+            self.stack.pop()
+
+    def merge(self, stages):
+        """Rattache à l'étape en cours les mesures produites dans un autre processus"""
+        for record in stages:
+            self.stages.append(dict(record, stage=';'.join(self.stack + [record['stage']]),
+                                    depth=len(self.stack) + record['depth']))
+
+    def _fold_peak(self):
+        """Reporte le pic tracemalloc courant sur l'étape en cours"""
+        if self.peaks:
+            self.peaks[-1] = max(self.peaks[-1], tracemalloc.get_traced_memory()[1])
+
+    def report(self):
+        """Profil complet : métadonnées et mesures de chaque étape, dans l'ordre de début"""
+        return {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'argv': sys.argv,
+            'pid': os.getpid(),
+            'trace_allocations': self.trace_allocations,
+            'stages': self.stages,
+        }
+
+    def collapsed(self):
+        """Lignes « pile temps_propre_µs » du format collapsed stacks"""
+        self_times = {}
+        for record in self.stages:
+            self_times[record['stage']] = self_times.get(record['stage'], 0) + record['wall_s']
+            parent, _, _ = record['stage'].rpartition(';')
+            if parent:
+                self_times[parent] = self_times.get(parent, 0) - record['wall_s']
+        return [f'{stack} {max(int(seconds * 1e6), 0)}' for stack, seconds in self_times.items()]
+
+    def save(self, path):
+        """Enregistre le profil JSON et, à côté, le fichier .folded ; retourne les deux chemins"""
+        folded_path = os.path.splitext(path)[0] + '.folded'
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        with open(folded_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(self.collapsed()) + '\n')
+        return path, folded_path
+
+    def print_summary(self):
+        """Affiche le tableau des étapes"""
+        alloc = self.trace_allocations
+        print(f"{'Étape':<40}{'Écoulé (s)':>12}{'CPU (s)':>10}{'CPU enf. (s)':>14}{'RSS max (Mo)':>14}"
+              + (f"{'Pic alloc (Mo)':>16}{'Blocs nets':>12}" if alloc else '') + f"{'PID':>9}")
+        for record in self.stages:
+            label = '  ' * record['depth'] + record['stage'].rpartition(';')[2]
+            print(f"{label[:39]:<40}{record['wall_s']:>12.3f}{record['cpu_s']:>10.3f}"
+                  f"{_cell(record['children_cpu_s'], 14, '.3f')}{_cell(record['peak_rss_mb'], 14, '.1f')}"
+                  + (f"{record['peak_alloc_mb']:>16.1f}{record['net_allocated_blocks']:>12,}" if alloc else '')
+                  + f"{record['pid']:>9}")